@@ -1,723 +1,594 @@
-
-
 import time
 import argparse
-import csv
-from selenium import webdriver
+import logging
+import os
+import queue
+from functools import partial
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.select import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 
+# Make the shared scraper_helpers package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper_helpers import (browser, jobqueue, journal as crawl_journal, logs, metrics, ord_cache, ord_export,
+                             ord_listing, ord_payload, ord_snapshot, ratecontrol, waits, watchdog)
+from scraper_helpers.sinks import ORD_SCHEMA, CsvRowSink, ParquetRowSink
+
+ORD_URL = "https://open-reaction-database.org"
+
+log = logging.getLogger("ord_scraper")
+
+
+def read_component(driver, wait, button, section: str, component_cache=None) -> list:
+    """(data_type, value, index) rows of the component behind a '<>' button.
+
+    Opens the modal, parses its <pre> payloads and closes it again. With a
+    component cache, a component whose card was seen before is answered from
+    the cache without opening the modal.
+    """
+    key = None
+    if component_cache is not None:
+        key = ord_cache.component_key(section, driver.execute_script(ord_cache.CARD_TEXT_JS, button))
+        rows = component_cache.get(key)
+        if rows is not None:
+            log.debug("Component already parsed, skipping its modal")
+            return rows
+
+    driver.execute_script("arguments[0].scrollIntoView(true);", button)
+    with metrics.timed("modal_open"):
+        driver.execute_script("arguments[0].click();", button)
+
+        # Wait for the modal <pre> to be populated
+        waits.wait_for_pre_text(driver, timeout=5)
+
+    # Extract data from the modal: read every <pre> in one call and parse each once
+    rows = []
+    extract_start = time.perf_counter()
+    try:
+        pre_texts = driver.execute_script(ord_payload.PRE_TEXTS_JS)
+        rows = ord_payload.extract_rows(pre_texts)
+    except Exception as e:
+        log.warning("Error extracting data: %s", e)
+    metrics.observe("extract", time.perf_counter() - extract_start)
+
+    # Look for and click the close button
+    close_start = time.perf_counter()
+    try:
+        close_button = wait.until(
+            EC.element_to_be_clickable((By.XPATH, "//div[@class='close']"))
+        )
+        log.debug("Closing modal...")
+        close_button.click()
+        waits.wait_for_gone(driver, (By.XPATH, "//div[@class='close']"), timeout=5)
+    except Exception as e:
+        log.warning("Could not find or click close button: %s", e)
+    metrics.observe("modal_close", time.perf_counter() - close_start)
+
+    if component_cache is not None:
+        component_cache.put(key, rows)
+    return rows
+
+
+def process_section(driver, wait, save_to_csv, section: dict, dataset_id: str = None, component_cache=None) -> None:
+    """Click through the tabs of one section (see ord_snapshot.SECTIONS) and read every '<>' component."""
+    name = section["name"]
+    log.debug("Looking for '%s' navbar item...", name)
+    try:
+        nav = wait.until(EC.element_to_be_clickable((By.XPATH, section["nav"])))
+        log.debug("Found '%s' navbar item, clicking it...", name)
+        nav.click()
+
+        # Wait for the section to load
+        waits.wait_for_presence(driver, (By.XPATH, section["ready"]), timeout=5)
+        log.debug("%s section loaded.", name)
+
+        tabs = driver.find_elements(By.XPATH, section["tabs"])
+        total_tabs = len(tabs)
+        log.debug("Found %s tab(s) in %s", total_tabs, name)
+
+        # Process each tab
+        for tab_idx in range(total_tabs):
+            tab_num = tab_idx + 1
+            # Re-fetch tabs to avoid stale element
+            tabs = driver.find_elements(By.XPATH, section["tabs"])
+            tab_text = tabs[tab_idx].text.strip() if tab_idx < len(tabs) else None
+
+            # For tabs after the first, click the tab
+            if tab_idx > 0:
+                tab = tabs[tab_idx]
+                log.debug("Clicking %s tab %s/%s: %s", name, tab_num, total_tabs, tab_text)
+                old_class = tab.get_attribute("class")
+                driver.execute_script("arguments[0].scrollIntoView(true);", tab)
+                driver.execute_script("arguments[0].click();", tab)
+                # Wait for the tab to become active
+                waits.wait_for_class_change(driver, tab, old_class, timeout=2)
+            else:
+                log.debug("Processing %s tab %s/%s (already selected): %s", name, tab_num, total_tabs, tab_text)
+
+            code_buttons = driver.find_elements(By.XPATH, section["buttons"])
+            log.debug("Found %s '<>' button(s) in %s tab %s", len(code_buttons), name, tab_num)
+
+            # Click each <> button
+            for btn_idx in range(len(code_buttons)):
+                try:
+                    # Re-fetch buttons to avoid stale element
+                    code_buttons = driver.find_elements(By.XPATH, section["buttons"])
+                    button = code_buttons[btn_idx]
+
+                    log.debug("Clicking '<>' button %s/%s in %s tab %s...", btn_idx + 1, len(code_buttons), name, tab_num)
+                    for data_type, value, idx in read_component(driver, wait, button, name, component_cache):
+                        log.debug("%s %s: %s", data_type, idx, value)
+                        save_to_csv([{
+                            'dataset_id': dataset_id,
+                            'section': name,
+                            'tab': tab_text,
+                            'data_type': data_type,
+                            'value': value,
+                            'index': idx
+                        }])
+
+                except Exception as e:
+                    log.warning("Could not click '<>' button %s: %s", btn_idx + 1, e)
+
+            log.debug("Completed %s tab %s", name, tab_num)
+
+        log.debug("All %s tabs processed.", name)
+
+    except Exception as e:
+        log.warning("Could not find or click '%s' navbar item: %s", name, e)
+
+
+def process_dataset(driver, wait, save_to_csv, dataset_number: int, dataset_id: str = None, component_cache=None,
+                    extract_mode: str = "clicks"):
+    """Process Inputs and Outcomes for a single dataset and collect data.
+
+    In "snapshot" mode every tab and modal is read by one injected script
+    (ord_snapshot); if the script fails, the tabs are clicked through from
+    Python instead ("clicks" mode).
+    """
+    log.debug("Processing Dataset #%s", dataset_number)
+
+    if extract_mode == "snapshot":
+        try:
+            components = ord_snapshot.snapshot(driver, timeout=5, component_cache=component_cache)
+        except Exception as e:
+            log.warning("Snapshot extraction failed, clicking through the tabs instead: %s", e)
+        else:
+            for section, tab_text, rows in components:
+                save_to_csv([
+                    {'dataset_id': dataset_id, 'section': section, 'tab': tab_text,
+                     'data_type': data_type, 'value': value, 'index': idx}
+                    for data_type, value, idx in rows
+                ])
+            log.debug("Finished Processing Dataset #%s (%s components)", dataset_number, len(components))
+            return
+
+    for section in ord_snapshot.SECTIONS:
+        process_section(driver, wait, save_to_csv, section, dataset_id, component_cache)
+
+    log.debug("Finished Processing Dataset #%s", dataset_number)
+
+
+def export_unit_rows(dataset_id: str, rows: list) -> list:
+    """CSV row dicts for (section, tab, data_type, value, index) rows from the bulk export."""
+    return [
+        {'dataset_id': dataset_id, 'section': section, 'tab': tab, 'data_type': data_type, 'value': value, 'index': idx}
+        for section, tab, data_type, value, idx in rows
+    ]
 
-def scrape_all_datasets(headless: bool = False, timeout: int = 30) -> None:
-    base_url = "https://open-reaction-database.org"
-    datasets = {}
+
+def select_largest_page_size(driver) -> bool:
+    """Pick the largest option of the listing's pagination select; False if there is none."""
+    select_elements = driver.find_elements(By.XPATH, "//select[@name='pagination']")
+    if not select_elements:
+        return False
+    select = Select(select_elements[0])
+    values = [option.get_attribute("value") for option in select.options]
+    largest = max((v for v in values if v.isdigit()), key=int, default=None)
+    if largest is None:
+        return False
+    links_locator = (By.CSS_SELECTOR, "a[href*='ord-']")
+    old_count = len(driver.find_elements(*links_locator))
+    select.select_by_value(largest)
+    # Wait for the listing to re-render with more entries
+    waits.wait_for_count_change(driver, links_locator, old_count, timeout=2)
+    log.debug("Selected %s entries per page.", largest)
+    return True
+
+
+def process_dataset_url(driver, wait, sink, dataset_url: str, dataset_idx: int, total_dataset_ids: int,
+                        journal=None, exporter=None, progress=None, component_cache=None,
+                        extract_mode: str = "clicks", prefetch: bool = False):
+    """Open one dataset page in a new tab and process all of its 'View Full Details' reactions.
+
+    Each detail button's rows go to `sink` together. With a journal, finished
+    detail buttons (and whole datasets) are skipped, and a unit is marked as
+    done only once the sink has written its rows to disk. With an exporter,
+    the dataset (or each reaction) is fetched as JSON first and the browser
+    walk is only used when that fails. `progress` is stepped once per reaction.
+    `component_cache` is shared across reactions so repeated components skip
+    their modals.
+    """
+    log.debug("Processing Dataset %s of %s", dataset_idx, total_dataset_ids)
+    
+    # Extract dataset ID from URL
+    dataset_id = dataset_url.split('/')[-1] if '/' in dataset_url else dataset_url
+    log.debug("Dataset ID: %s", dataset_id)
+    
+    if journal is not None and journal.is_done(dataset_id, crawl_journal.LINK_DONE):
+        log.debug("Dataset already completed in a previous run, skipping...")
+        return
+    
+    # Bulk export: the whole dataset in one request, no browser needed
+    reactions = exporter.dataset_reactions(dataset_id) if exporter is not None else None
+    if reactions is not None:
+        log.debug("Fetched %s reactions from the dataset export", len(reactions))
+        for button_num, reaction in enumerate(reactions, 1):
+            if journal is not None and journal.is_done(dataset_id, button_num):
+                continue
+            unit_rows = export_unit_rows(dataset_id, ord_export.reaction_rows(reaction))
+            sink.write_rows(unit_rows, on_flushed=journal and partial(journal.mark_done, dataset_id, button_num))
+            if progress is not None:
+                progress.step()
+        if journal is not None:
+            sink.write_rows([], on_flushed=partial(journal.mark_done, dataset_id, crawl_journal.LINK_DONE))
+        return
+    
+    # Open the dataset in a new tab
+    log.debug("Opening dataset in a new tab...")
+    dataset_tab = browser.open_tab(driver, dataset_url)
     
-    # Initialize data collection structure
-    scraped_data = []  # List to store all extracted data rows
-    csv_filename = "scraped_data.csv"
-    csv_columns = ['dataset_id', 'section', 'tab', 'data_type', 'value', 'index']
+    # Wait for the dataset page to fully load by checking for specific elements
+    log.debug("Waiting for dataset page to fully load...")
     
-    # Initialize CSV file with header
+    # Wait for URL to change to the dataset page
+    wait.until(lambda d: "ord_dataset-" in d.current_url)
+    
+    # Wait for page body to be present
+    wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    
+    # Wait for document ready state
+    wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+    
+    # Additional wait for any dynamic content to load
+    wait.until(EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'ord_dataset-') or contains(@class, 'dataset')]")))
+    
+    log.debug("Dataset page fully loaded: %s", driver.current_url)
+    
+    # Read every detail URL from the page's client-side data: no scrolling or re-pagination
+    log.debug("Reading the dataset listing...")
+    def listed(d):
+        listing = ord_listing.detail_urls(d, dataset_url)
+        return listing if ord_listing.complete(listing[0], listing[2]) else None
+    detail_urls, source, reported = waits.wait_until(driver, listed) or ord_listing.detail_urls(driver, dataset_url)
+    if source == "dom" or not ord_listing.complete(detail_urls, reported):
+        # No client-side state, or a partial one: render the largest page size once and add its links
+        if select_largest_page_size(driver):
+            more_urls, _, more_reported = ord_listing.detail_urls(driver, dataset_url)
+            detail_urls = ord_listing.merge(detail_urls, more_urls)
+            reported = reported if reported is not None else more_reported
+    total_buttons = len(detail_urls)
+    if reported is not None and total_buttons < reported:
+        log.warning("Dataset %s lists %s of the %s reactions it reports; scraping those", dataset_id,
+                    total_buttons, reported)
+    log.debug("Found %s reaction(s) in the dataset listing (%s)", total_buttons, source)
+    
+    # With `prefetch`, the next reaction loads in a background tab while the current one is extracted
+    # (not when a reaction export answers the reactions without a tab)
+    prefetch = prefetch and (exporter is None or exporter.reaction_template is None)
+    prefetched = None  # (url, handle)
+
+    def next_pending(after: int):
+        for num in range(after + 1, total_buttons + 1):
+            if journal is None or not journal.is_done(dataset_id, num):
+                return detail_urls[num - 1]
+        return None
+
+    # Process every reaction in the listing
     try:
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=csv_columns)
-            writer.writeheader()
-        print(f"✓ CSV file initialized: {csv_filename}\n")
+        log.debug("Processing All View Full Details Buttons for Dataset %s", dataset_idx)
+    
+        if total_buttons == 0:
+            log.debug("No buttons found.")
+        for button_num, button_url in enumerate(detail_urls, 1):
+            log.debug("[Button %s/%s] Processing button...", button_num, total_buttons)
+    
+            if journal is not None and journal.is_done(dataset_id, button_num):
+                log.debug("Already completed in a previous run, skipping...")
+                continue
+    
+            unit_start = time.perf_counter()
+    
+            # Reaction export: the whole reaction in one request instead of the modal walk
+            export_rows = exporter.reaction_rows(button_url) if exporter is not None else None
+            if export_rows is not None:
+                log.debug("Fetched %s values from the reaction export", len(export_rows))
+                sink.write_rows(export_unit_rows(dataset_id, export_rows),
+                                on_flushed=journal and partial(journal.mark_done, dataset_id, button_num))
+                metrics.observe("unit", time.perf_counter() - unit_start)
+                if progress is not None:
+                    progress.step()
+                continue
+    
+            if prefetched is not None and prefetched[0] == button_url:
+                log.debug("Switching to the prefetched tab: %s", button_url)
+                browser.take_prefetched(driver, prefetched[1], button_url)
+            else:
+                if prefetched is not None:
+                    browser.close_tab(driver, prefetched[1])
+                log.debug("Opening URL in new tab: %s", button_url)
+                browser.open_tab(driver, button_url)
+            prefetched = None
+            next_url = next_pending(button_num) if prefetch else None
+            if next_url:
+                prefetched = (next_url, browser.prefetch_tab(driver, next_url))
+    
+            # Process this modal's Inputs and Outcomes data
+            unit_rows = []
+            process_dataset(driver, wait, unit_rows.extend, button_num, dataset_id, component_cache, extract_mode)
+            sink.write_rows(unit_rows, on_flushed=journal and partial(journal.mark_done, dataset_id, button_num))
+    
+            # Close the tab and switch back to the dataset window
+            log.debug("Closing modal tab and returning to dataset page...")
+            driver.close()
+            driver.switch_to.window(dataset_tab)
+            metrics.observe("unit", time.perf_counter() - unit_start)
+            if watchdog.checkpoint(driver, keep=[dataset_tab] + ([prefetched[1]] if prefetched else [])):
+                raise watchdog.SessionRetired(f"browser retired after reaction {button_num} of {dataset_id}")
+            if progress is not None:
+                progress.step()
+    
+        log.debug("Completed processing %s buttons for dataset %s.", total_buttons, dataset_idx)
+        if journal is not None:
+            sink.write_rows([], on_flushed=partial(journal.mark_done, dataset_id, crawl_journal.LINK_DONE))
+    
+    except watchdog.SessionRetired:
+        raise
     except Exception as e:
-        print(f"✗ Error initializing CSV file: {e}\n")
+        log.warning("Error processing View Full Details buttons: %s", e)
     
-    options = Options()
-    if headless:
-        # Selenium 4.8+ supports the new headless flag, but fallback works too
-        options.add_argument("--headless=new")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    # Install driver via webdriver-manager and start Chrome
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    try:
-        # Maximize the browser window
-        driver.maximize_window()
-        
-        driver.get(base_url)
+    # Close the dataset tab and return to the main window
+    log.debug("Closing dataset tab and returning to browse page...")
+    if prefetched is not None:
+        browser.close_tab(driver, prefetched[1])
+    driver.close()
+    driver.switch_to.window(driver.window_handles[0])
 
-        wait = WebDriverWait(driver, timeout)
 
-        # Look for an <a> element whose text is exactly 'Browse' (top navigation)
-        browse = wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//a[normalize-space()='Browse']"))
-        )
-        print("Found 'Browse' element; clicking it...")
-        browse.click()
+def process_dataset_with_retry(pool, timeout: int, sink, dataset_url: str, dataset_idx: int, total_dataset_ids: int,
+                               journal=None, exporter=None, progress=None, component_cache=None,
+                               extract_mode: str = "clicks", prefetch: bool = False) -> None:
+    """process_dataset_url on a pooled session, retried with backoff when the dataset page fails.
 
-        # Wait for the URL to change from the landing page
-        wait.until(lambda d: d.current_url != base_url)
-        print("Navigation successful; current URL:", driver.current_url)
-        
-        # Wait for the browse page to fully load
-        time.sleep(0.5)
-        
-        # Wait for dataset links to be present
-        print("Waiting for dataset IDs to load...")
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, "//a[contains(@href, 'ord_dataset-')]"))
-        )
-        
-        # Count the total number of dataset IDs present
-        dataset_links = driver.find_elements(By.XPATH, "//a[contains(@href, 'ord_dataset-')]")
-        total_dataset_ids = len(dataset_links)
-        print(f"Found {total_dataset_ids} total dataset IDs on the browse page.")
-        
-        # Get all dataset URLs
-        print("Collecting all dataset URLs...")
-        dataset_urls = []
-        for link in dataset_links:
-            dataset_urls.append(link.get_attribute("href"))
-        
-        # Helper function to save data incrementally to CSV
-        def save_to_csv(data_to_save):
-            """Append data rows to CSV file."""
+    Pending rows are flushed before a retry so the journal marks the reactions
+    already saved and the retry skips them. A browser retired by the watchdog
+    is handed back mid-dataset and the dataset continues on a fresh one the
+    same way, without counting as a retry.
+    """
+    def attempt():
+        while True:
             try:
-                with open(csv_filename, 'a', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=csv_columns)
-                    writer.writerows(data_to_save)
-            except Exception as e:
-                print(f"✗ Error saving to CSV: {e}")
+                # Tabs left open by a failed attempt are closed when the session goes back to the pool
+                with pool.session() as driver:
+                    wait = WebDriverWait(driver, timeout)
+                    process_dataset_url(driver, wait, sink, dataset_url, dataset_idx, total_dataset_ids, journal,
+                                        exporter, progress, component_cache, extract_mode, prefetch)
+                return
+            except watchdog.SessionRetired as e:
+                log.info("Continuing dataset %s on a fresh browser: %s", dataset_idx, e)
+                sink.flush()
+
+    ratecontrol.policy().call(attempt, label=f"dataset {dataset_idx}", before_retry=sink.flush)
+
+
+def dataset_worker(worker_id: int, url_queue, sink, pool, timeout: int, total_dataset_ids: int,
+                   journal=None, exporter=None, progress=None, reaction_progress=None,
+                   component_cache=None, extract_mode: str = "clicks", prefetch: bool = False) -> int:
+    """Pull dataset URLs off the shared queue and process each one with a warm browser from the pool."""
+    processed = 0
+    while True:
+        try:
+            dataset_idx, dataset_url = url_queue.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            process_dataset_with_retry(pool, timeout, sink, dataset_url, dataset_idx, total_dataset_ids, journal,
+                                       exporter, reaction_progress, component_cache, extract_mode, prefetch)
+            processed += 1
+        except Exception as e:
+            log.warning("[Worker %s] Dataset %s (%s) failed after retries: %s", worker_id, dataset_idx, dataset_url, e)
+        if progress is not None:
+            progress.step()
+    log.info("[Worker %s] Finished after %s dataset(s).", worker_id, processed)
+    return processed
+
+
+def scrape_datasets_parallel(dataset_urls: list, workers: int, pool, timeout: int,
+                             sink, journal=None, exporter=None, progress_every: int = 10,
+                             component_cache=None, extract_mode: str = "clicks", prefetch: bool = False) -> None:
+    """Shard dataset URLs across the pool's browser sessions, all sharing one CSV sink."""
+    total_dataset_ids = len(dataset_urls)
+    url_queue = queue.Queue()
+    for dataset_idx, dataset_url in enumerate(dataset_urls, 1):
+        url_queue.put((dataset_idx, dataset_url))
+
+    workers = min(workers, total_dataset_ids) or 1
+    log.info("Processing %s datasets with %s browser workers...", total_dataset_ids, workers)
+    progress = logs.Progress(log, "datasets", total_dataset_ids, every=progress_every)
+    reaction_progress = logs.Progress(log, "reactions", every=progress_every)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(dataset_worker, worker_id, url_queue, sink, pool, timeout, total_dataset_ids,
+                            journal, exporter, progress, reaction_progress, component_cache, extract_mode,
+                            prefetch)
+            for worker_id in range(1, workers + 1)
+        ]
+        processed = sum(future.result() for future in futures)
+    sink.flush()
+
+    log.info("Completed processing %s of %s datasets.", processed, total_dataset_ids)
+    log.info("Restarted %s browser session(s) that hit the page or memory limit.", pool.restarts)
+    totals = waits.wait_totals()
+    log.info("Waited %.1f s over %s event waits (%s timed out).", totals['seconds'], totals['calls'], totals['timeouts'])
+    log.info("✓ All data has been saved to %s", sink.filename)
+
+
+def dataset_job_url(target: str, base_url: str) -> str:
+    """URL of a job's dataset: a URL as given, a dataset ID under `base_url`."""
+    return target if "://" in target else f"{base_url.rstrip('/')}/dataset/{target}"
+
+
+def serve_dataset_jobs(job_queue, pool, timeout: int, sink, journal, exporter=None, component_cache=None,
+                       extract_mode: str = "clicks", prefetch: bool = False, base_url: str = ORD_URL,
+                       workers: int = 1, poll: float = 2.0, idle_exit: float = None,
+                       progress_every: int = 10) -> None:
+    """Process ORD dataset jobs from the queue with the pool's warm browsers until the service stops.
+
+    A job counts as done once its rows are flushed to the output.
+    """
+    reaction_progress = logs.Progress(log, "reactions", every=progress_every)
+
+    def handle(job) -> int:
+        dataset_url = dataset_job_url(job.target, base_url)
+        if job.attempts == 1:
+            # A new job scrapes the dataset again; a requeued one resumes where the last service stopped
+            journal.forget(dataset_url.split('/')[-1])
+        job_sink = jobqueue.CountingSink(sink)
+        total_jobs = sum(job_queue.counts("ord").values())
+        process_dataset_with_retry(pool, timeout, job_sink, dataset_url, job.id, total_jobs, journal, exporter,
+                                   reaction_progress, component_cache, extract_mode, prefetch)
+        sink.flush()
+        return job_sink.rows
+
+    jobqueue.serve(job_queue, "ord", handle, workers, poll, idle_exit)
+
+
+def collect_dataset_urls(driver, base_url: str, timeout: int) -> list:
+    """Open the Browse page and return the URL of every dataset listed there."""
+    driver.get(base_url)
+
+    wait = WebDriverWait(driver, timeout)
+
+    # Look for an <a> element whose text is exactly 'Browse' (top navigation)
+    browse = wait.until(
+        EC.element_to_be_clickable((By.XPATH, "//a[normalize-space()='Browse']"))
+    )
+    log.debug("Found 'Browse' element; clicking it...")
+    browse.click()
+
+    # Wait for the URL to change from the landing page
+    wait.until(lambda d: d.current_url != base_url)
+    log.debug("Navigation successful; current URL: %s", driver.current_url)
+    
+    # Wait for dataset links to be present
+    log.debug("Waiting for dataset IDs to load...")
+    wait.until(
+        EC.presence_of_element_located((By.XPATH, "//a[contains(@href, 'ord_dataset-')]"))
+    )
+    
+    # Count the total number of dataset IDs present
+    dataset_links = driver.find_elements(By.XPATH, "//a[contains(@href, 'ord_dataset-')]")
+    total_dataset_ids = len(dataset_links)
+    log.info("Found %s total dataset IDs on the browse page.", total_dataset_ids)
+    
+    # Get all dataset URLs
+    log.debug("Collecting all dataset URLs...")
+    dataset_urls = []
+    for link in dataset_links:
+        dataset_urls.append(link.get_attribute("href"))
+    return dataset_urls
+
+
+def scrape_all_datasets(headless: bool = False, timeout: int = 30, workers: int = 1, resume: bool = False,
+                        output_format: str = "csv", dataset_export_url: str = None,
+                        reaction_export_url: str = None, profile=browser.DEFAULT_PROFILE,
+                        progress_every: int = 10, base_url: str = ORD_URL, keep_open: bool = True,
+                        component_cache_size: int = 0, extract_mode: str = "clicks",
+                        prefetch: bool = False, job_queue=None, poll: float = 2.0, idle_exit: float = None,
+                        watchdog_limits: dict = None) -> None:
+    """Scrape every dataset on the Browse page, or with `job_queue`, serve dataset jobs from it."""
+    # Open the output once; rows are buffered and written in batches (a resumed run appends)
+    if output_format == "parquet":
+        sink = ParquetRowSink("scraped_data.parquet", ORD_SCHEMA, resume=resume)
+    else:
+        sink = CsvRowSink("scraped_data.csv", [name for name, _ in ORD_SCHEMA], resume=resume)
+    if sink.appending:
+        log.info("✓ Resuming, appending new rows to: %s", sink.filename)
+    else:
+        log.info("✓ Output file initialized: %s", sink.filename)
+    
+    journal = crawl_journal.CrawlJournal("scraped_data.journal.sqlite", resume=resume)
+    exporter = None
+    if dataset_export_url or reaction_export_url:
+        exporter = ord_export.OrdExporter(dataset_export_url, reaction_export_url)
+    if resume:
+        log.info("✓ Crawl journal has %s completed unit(s)", journal.count())
+    # Parsed components shared by every worker; repeated reagents and solvents skip their modals
+    component_cache = ord_cache.ComponentCache(component_cache_size) if component_cache_size > 0 else None
+
+    # Warm browsers are reused across datasets and only restarted at their page/memory limit
+    pool = browser.DriverPool(max(workers, 1), headless, profile)
+    watchdog.start([sink], **(watchdog_limits or {}))
+    watchdog.watch(pool)
+    try:
+        pool.warm()
+        if job_queue is not None:
+            serve_dataset_jobs(job_queue, pool, timeout, sink, journal, exporter, component_cache, extract_mode,
+                               prefetch, base_url, workers, poll, idle_exit, progress_every)
+            return
+        with pool.session() as driver:
+            dataset_urls = collect_dataset_urls(driver, base_url, timeout)
+        total_dataset_ids = len(dataset_urls)
         
-        # Define process_dataset function (will process Inputs/Outcomes inside a modal)
-        def process_dataset(dataset_number: int, dataset_id: str = None):
-            """Process Inputs and Outcomes for a single dataset and collect data."""
-            print(f"\n{'='*60}")
-            print(f"Processing Dataset #{dataset_number}")
-            print(f"{'='*60}")
-            
-            # Look for and click "Inputs" in the navbar
-            print("Looking for 'Inputs' navbar item...")
-            try:
-                inputs_nav = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, "//div[@class='nav-item' and contains(text(), 'inputs')]"))
-                )
-                print("Found 'Inputs' navbar item, clicking it...")
-                inputs_nav.click()
-                
-                # Wait for the inputs section to load
-                time.sleep(0.5)
-                print("Inputs section loaded.")
-                
-                # Find all tabs within the inputs section (id="inputs")
-                tabs = driver.find_elements(By.XPATH, "//div[@id='inputs']//div[@class='tabs']//div[contains(@class, 'tab')]")
-                total_tabs = len(tabs)
-                print(f"Found {total_tabs} tabs in inputs section")
-                
-                # Process each tab
-                for tab_idx in range(total_tabs):
-                    tab_num = tab_idx + 1
-                    tab_text = None  # Initialize tab_text
-                    
-                    # For tabs after the first, click the tab
-                    if tab_idx > 0:
-                        # Re-fetch tabs to avoid stale element
-                        tabs = driver.find_elements(By.XPATH, "//div[@id='inputs']//div[@class='tabs']//div[contains(@class, 'tab')]")
-                        tab = tabs[tab_idx]
-                        tab_text = tab.text.strip()
-                        
-                        print(f"\nClicking tab {tab_num}/{total_tabs}: {tab_text}")
-                        driver.execute_script("arguments[0].scrollIntoView(true);", tab)
-                        time.sleep(0.5)
-                        driver.execute_script("arguments[0].click();", tab)
-                        time.sleep(0.5)
-                    else:
-                        # Get the text of the first tab too
-                        tabs = driver.find_elements(By.XPATH, "//div[@id='inputs']//div[@class='tabs']//div[contains(@class, 'tab')]")
-                        if tabs:
-                            tab_text = tabs[0].text.strip()
-                        print(f"\nProcessing tab {tab_num}/{total_tabs} (already selected): {tab_text}")
-                        time.sleep(0.5)
-                    
-                    # Find all <> buttons under the "input" div
-                    code_buttons = driver.find_elements(By.XPATH, "//div[@class='input']//div[@class='button' and contains(text(), '<>')]")
-                    print(f"Found {len(code_buttons)} '<>' buttons in tab {tab_num}")
-                    
-                    # Click each <> button
-                    for btn_idx in range(len(code_buttons)):
-                        try:
-                            # Re-fetch buttons to avoid stale element
-                            code_buttons = driver.find_elements(By.XPATH, "//div[@class='input']//div[@class='button' and contains(text(), '<>')]")
-                            button = code_buttons[btn_idx]
-                            
-                            print(f"  Clicking '<>' button {btn_idx + 1}/{len(code_buttons)} in tab {tab_num}...")
-                            driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                            time.sleep(0.5)
-                            driver.execute_script("arguments[0].click();", button)
-                            
-                            # Wait 0.5 seconds
-                            time.sleep(0.5)
-                            
-                            # Extract data from the modal
-                            try:
-                                # Check if modal contains identifiers
-                                pre_elements = driver.find_elements(By.XPATH, "//pre")
-                                has_identifiers = False
-                                type_value = None
-                                identifier_value = None
-                                
-                                if pre_elements:
-                                    pre_text = pre_elements[0].text
-                                    has_identifiers = 'identifiers' in pre_text
-                                    
-                                    if has_identifiers:
-                                        # Extract all identifier values
-                                        try:
-                                            identifier_values = []
-                                            search_start = 0
-                                            while True:
-                                                value_pos = pre_text.find('"value":', search_start)
-                                                if value_pos == -1:
-                                                    break
-                                                value_start = value_pos + len('"value":')
-                                                value_part = pre_text[value_start:].strip()
-                                                if value_part.startswith('"'):
-                                                    value_end = value_part.find('"', 1)
-                                                    if value_end > 0:
-                                                        identifier_values.append(value_part[1:value_end])
-                                                search_start = value_start + 1
-                                            
-                                            # Print all identifier values with numbering if more than one
-                                            if len(identifier_values) > 1:
-                                                for idx, val in enumerate(identifier_values, 1):
-                                                    print(f"    Identifier value {idx}: {val}")
-                                                    save_to_csv([{
-                                                        'dataset_id': dataset_id,
-                                                        'section': 'Inputs',
-                                                        'tab': tab_text,
-                                                        'data_type': 'identifier',
-                                                        'value': val,
-                                                        'index': idx
-                                                    }])
-                                            elif len(identifier_values) == 1:
-                                                print(f"    Identifier value: {identifier_values[0]}")
-                                                save_to_csv([{
-                                                    'dataset_id': dataset_id,
-                                                    'section': 'Inputs',
-                                                    'tab': tab_text,
-                                                    'data_type': 'identifier',
-                                                    'value': identifier_values[0],
-                                                    'index': 1
-                                                }])
-                                        except Exception as e:
-                                            print(f"    Could not extract identifier value: {e}")
-                                    else:
-                                        # Extract type and value when no identifiers
-                                        try:
-                                            if '"type":' in pre_text:
-                                                type_start = pre_text.find('"type":') + len('"type":')
-                                                type_part = pre_text[type_start:].strip()
-                                                if type_part.startswith('"'):
-                                                    type_end = type_part.find('"', 1)
-                                                    if type_end > 0:
-                                                        type_value = type_part[1:type_end]
-                                                        print(f"    Type: {type_value}")
-                                                        save_to_csv([{
-                                                            'dataset_id': dataset_id,
-                                                            'section': 'Inputs',
-                                                            'tab': tab_text,
-                                                            'data_type': 'type',
-                                                            'value': type_value,
-                                                            'index': 1
-                                                        }])
-                                        except Exception as e:
-                                            print(f"    Could not extract type: {e}")
-                                        
-                                        try:
-                                            if '"value":' in pre_text:
-                                                value_start = pre_text.find('"value":') + len('"value":')
-                                                value_part = pre_text[value_start:].strip()
-                                                # Check if value is a number or string
-                                                if value_part.startswith('"'):
-                                                    value_end = value_part.find('"', 1)
-                                                    if value_end > 0:
-                                                        identifier_value = value_part[1:value_end]
-                                                else:
-                                                    # Handle numeric values
-                                                    value_end = value_part.find(',')
-                                                    if value_end == -1:
-                                                        value_end = value_part.find('}')
-                                                    if value_end > 0:
-                                                        identifier_value = value_part[:value_end].strip()
-                                                    else:
-                                                        identifier_value = value_part.split()[0].strip()
-                                                print(f"    Value: {identifier_value}")
-                                                save_to_csv([{
-                                                    'dataset_id': dataset_id,
-                                                    'section': 'Inputs',
-                                                    'tab': tab_text,
-                                                    'data_type': 'value',
-                                                    'value': identifier_value,
-                                                    'index': 1
-                                                }])
-                                        except Exception as e:
-                                            print(f"    Could not extract value: {e}")
-                                
-                                # Find the reaction_role from <pre> tag
-                                reaction_role = None
-                                try:
-                                    pre_elements = driver.find_elements(By.XPATH, "//pre[contains(text(), 'reaction_role')]")
-                                    if pre_elements:
-                                        pre_text = pre_elements[0].text
-                                        # Extract reaction_role value
-                                        if 'reaction_role:' in pre_text:
-                                            role_start = pre_text.find('reaction_role:') + len('reaction_role:')
-                                            role_part = pre_text[role_start:].strip()
-                                            # Get the role value (before newline or end)
-                                            reaction_role = role_part.split()[0].strip()
-                                            print(f"    Reaction role: {reaction_role}")
-                                            save_to_csv([{
-                                                'dataset_id': dataset_id,
-                                                'section': 'Inputs',
-                                                'tab': tab_text,
-                                                'data_type': 'reaction_role',
-                                                'value': reaction_role,
-                                                'index': 1
-                                            }])
-                                except Exception as e:
-                                    print(f"    Could not extract reaction_role: {e}")
-                            except Exception as e:
-                                print(f"    Error extracting data: {e}")
-                            
-                            # Look for and click the close button
-                            try:
-                                close_button = wait.until(
-                                    EC.element_to_be_clickable((By.XPATH, "//div[@class='close']"))
-                                )
-                                print(f"  Closing modal...")
-                                close_button.click()
-                                time.sleep(0.5)
-                            except Exception as e:
-                                print(f"  Could not find or click close button: {e}")
-                            
-                        except Exception as e:
-                            print(f"  Could not click '<>' button {btn_idx + 1}: {e}")
-                    
-                    print(f"Completed tab {tab_num}")
-                
-                print("\nAll tabs processed.")
-                
-            except Exception as e:
-                print(f"Could not find or click 'Inputs' navbar item: {e}")
-            
-            # Look for and click "Outcomes" in the navbar
-            print("\nLooking for 'Outcomes' navbar item...")
-            try:
-                outcomes_nav = wait.until(
-                    EC.element_to_be_clickable((By.XPATH, "//div[@class='nav-item' and contains(text(), 'outcomes')]"))
-                )
-                print("Found 'Outcomes' navbar item, clicking it...")
-                outcomes_nav.click()
-                
-                # Wait for the outcomes section to load
-                time.sleep(0.5)
-                print("Outcomes section loaded.")
-                
-                # Find all Product tabs within the sub-section under Products title
-                product_tabs = driver.find_elements(By.XPATH, "//div[@class='title' and contains(text(), 'Products')]/following-sibling::div[@class='sub-section']//div[@class='tabs']//div[contains(@class, 'tab')]")
-                total_product_tabs = len(product_tabs)
-                print(f"Found {total_product_tabs} Product tab(s)")
-                
-                # Process each Product tab
-                for tab_idx in range(total_product_tabs):
-                    tab_num = tab_idx + 1
-                    tab_text = None  # Initialize tab_text
-                    
-                    # For tabs after the first, click the tab
-                    if tab_idx > 0:
-                        # Re-fetch tabs to avoid stale element
-                        product_tabs = driver.find_elements(By.XPATH, "//div[@class='title' and contains(text(), 'Products')]/following-sibling::div[@class='sub-section']//div[@class='tabs']//div[contains(@class, 'tab')]")
-                        tab = product_tabs[tab_idx]
-                        tab_text = tab.text.strip()
-                        
-                        print(f"\nClicking Product tab {tab_num}/{total_product_tabs}: {tab_text}")
-                        driver.execute_script("arguments[0].scrollIntoView(true);", tab)
-                        time.sleep(0.5)
-                        driver.execute_script("arguments[0].click();", tab)
-                        time.sleep(0.5)
-                    else:
-                        # Get the text of the first tab too
-                        product_tabs = driver.find_elements(By.XPATH, "//div[@class='title' and contains(text(), 'Products')]/following-sibling::div[@class='sub-section']//div[@class='tabs']//div[contains(@class, 'tab')]")
-                        if product_tabs:
-                            tab_text = product_tabs[0].text.strip()
-                        print(f"\nProcessing Product tab {tab_num}/{total_product_tabs} (already selected): {tab_text}")
-                        time.sleep(0.5)
-                    
-                    # Find all <> buttons in the currently active Product tab
-                    code_buttons = driver.find_elements(By.XPATH, "//div[@class='title' and contains(text(), 'Products')]/following-sibling::div[@class='sub-section']//div[@class='button' and contains(text(), '<>')]")
-                    print(f"Found {len(code_buttons)} '<>' button(s) in Product tab {tab_num}")
-                    
-                    # Click each <> button in this Product tab
-                    for btn_idx in range(len(code_buttons)):
-                        try:
-                            # Re-fetch buttons to avoid stale element
-                            code_buttons = driver.find_elements(By.XPATH, "//div[@class='title' and contains(text(), 'Products')]/following-sibling::div[@class='sub-section']//div[@class='button' and contains(text(), '<>')]")
-                            button = code_buttons[btn_idx]
-                            
-                            print(f"  Clicking '<>' button {btn_idx + 1}/{len(code_buttons)} in Product tab {tab_num}...")
-                            driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                            time.sleep(0.5)
-                            driver.execute_script("arguments[0].click();", button)
-                            
-                            # Wait 0.5 seconds
-                            time.sleep(0.5)
-                            
-                            # Extract data from the modal
-                            try:
-                                # Check if modal contains identifiers
-                                pre_elements = driver.find_elements(By.XPATH, "//pre")
-                                has_identifiers = False
-                                type_value = None
-                                identifier_value = None
-                                
-                                if pre_elements:
-                                    pre_text = pre_elements[0].text
-                                    has_identifiers = 'identifiers' in pre_text
-                                    
-                                    if has_identifiers:
-                                        # Extract all identifier values
-                                        try:
-                                            identifier_values = []
-                                            search_start = 0
-                                            while True:
-                                                value_pos = pre_text.find('"value":', search_start)
-                                                if value_pos == -1:
-                                                    break
-                                                value_start = value_pos + len('"value":')
-                                                value_part = pre_text[value_start:].strip()
-                                                if value_part.startswith('"'):
-                                                    value_end = value_part.find('"', 1)
-                                                    if value_end > 0:
-                                                        identifier_values.append(value_part[1:value_end])
-                                                search_start = value_start + 1
-                                            
-                                            # Print all identifier values with numbering if more than one
-                                            if len(identifier_values) > 1:
-                                                for idx, val in enumerate(identifier_values, 1):
-                                                    print(f"    Identifier value {idx}: {val}")
-                                                    save_to_csv([{
-                                                        'dataset_id': dataset_id,
-                                                        'section': 'Outcomes',
-                                                        'tab': tab_text,
-                                                        'data_type': 'identifier',
-                                                        'value': val,
-                                                        'index': idx
-                                                    }])
-                                            elif len(identifier_values) == 1:
-                                                print(f"    Identifier value: {identifier_values[0]}")
-                                                save_to_csv([{
-                                                    'dataset_id': dataset_id,
-                                                    'section': 'Outcomes',
-                                                    'tab': tab_text,
-                                                    'data_type': 'identifier',
-                                                    'value': identifier_values[0],
-                                                    'index': 1
-                                                }])
-                                        except Exception as e:
-                                            print(f"    Could not extract identifier value: {e}")
-                                    else:
-                                        # Extract type and value when no identifiers
-                                        try:
-                                            if '"type":' in pre_text:
-                                                type_start = pre_text.find('"type":') + len('"type":')
-                                                type_part = pre_text[type_start:].strip()
-                                                if type_part.startswith('"'):
-                                                    type_end = type_part.find('"', 1)
-                                                    if type_end > 0:
-                                                        type_value = type_part[1:type_end]
-                                                        print(f"    Type: {type_value}")
-                                                        save_to_csv([{
-                                                            'dataset_id': dataset_id,
-                                                            'section': 'Outcomes',
-                                                            'tab': tab_text,
-                                                            'data_type': 'type',
-                                                            'value': type_value,
-                                                            'index': 1
-                                                        }])
-                                        except Exception as e:
-                                            print(f"    Could not extract type: {e}")
-                                        
-                                        try:
-                                            if '"value":' in pre_text:
-                                                value_start = pre_text.find('"value":') + len('"value":')
-                                                value_part = pre_text[value_start:].strip()
-                                                # Check if value is a number or string
-                                                if value_part.startswith('"'):
-                                                    value_end = value_part.find('"', 1)
-                                                    if value_end > 0:
-                                                        identifier_value = value_part[1:value_end]
-                                                else:
-                                                    # Handle numeric values
-                                                    value_end = value_part.find(',')
-                                                    if value_end == -1:
-                                                        value_end = value_part.find('}')
-                                                    if value_end > 0:
-                                                        identifier_value = value_part[:value_end].strip()
-                                                    else:
-                                                        identifier_value = value_part.split()[0].strip()
-                                                print(f"    Value: {identifier_value}")
-                                                save_to_csv([{
-                                                    'dataset_id': dataset_id,
-                                                    'section': 'Outcomes',
-                                                    'tab': tab_text,
-                                                    'data_type': 'value',
-                                                    'value': identifier_value,
-                                                    'index': 1
-                                                }])
-                                        except Exception as e:
-                                            print(f"    Could not extract value: {e}")
-                                
-                                # Find the reaction_role from <pre> tag
-                                reaction_role = None
-                                try:
-                                    pre_elements = driver.find_elements(By.XPATH, "//pre[contains(text(), 'reaction_role')]")
-                                    if pre_elements:
-                                        pre_text = pre_elements[0].text
-                                        # Extract reaction_role value
-                                        if 'reaction_role:' in pre_text:
-                                            role_start = pre_text.find('reaction_role:') + len('reaction_role:')
-                                            role_part = pre_text[role_start:].strip()
-                                            # Get the role value (before newline or end)
-                                            reaction_role = role_part.split()[0].strip()
-                                            print(f"    Reaction role: {reaction_role}")
-                                            save_to_csv([{
-                                                'dataset_id': dataset_id,
-                                                'section': 'Outcomes',
-                                                'tab': tab_text,
-                                                'data_type': 'reaction_role',
-                                                'value': reaction_role,
-                                                'index': 1
-                                            }])
-                                except Exception as e:
-                                    print(f"    Could not extract reaction_role: {e}")
-                            except Exception as e:
-                                print(f"    Error extracting data: {e}")
-                            
-                            # Look for and click the close button
-                            try:
-                                close_button = wait.until(
-                                    EC.element_to_be_clickable((By.XPATH, "//div[@class='close']"))
-                                )
-                                print(f"  Closing modal...")
-                                close_button.click()
-                                time.sleep(1)
-                            except Exception as e:
-                                print(f"  Could not find or click close button: {e}")
-                            
-                        except Exception as e:
-                            print(f"  Could not click '<>' button {btn_idx + 1}: {e}")
-                    
-                    print(f"Completed Product tab {tab_num}")
-                
-                print("\nAll Product tabs processed.")
-                
-            except Exception as e:
-                print(f"Could not find or click 'Outcomes' navbar item: {e}")
-            
-            print(f"\n{'='*60}")
-            print(f"Finished Processing Dataset #{dataset_number}")
-            print(f"{'='*60}\n")
+        if workers > 1:
+            scrape_datasets_parallel(dataset_urls, workers, pool, timeout, sink, journal, exporter, progress_every,
+                                     component_cache, extract_mode, prefetch)
+            return
         
         # ============ MAIN LOOP: Process each dataset ============
+        progress = logs.Progress(log, "datasets", total_dataset_ids, every=progress_every)
+        reaction_progress = logs.Progress(log, "reactions", every=progress_every)
         for dataset_idx, dataset_url in enumerate(dataset_urls, 1):
-            print(f"\n{'='*80}")
-            print(f"Processing Dataset {dataset_idx} of {total_dataset_ids}")
-            print(f"{'='*80}")
-            
-            # Extract dataset ID from URL
-            dataset_id = dataset_url.split('/')[-1] if '/' in dataset_url else dataset_url
-            print(f"Dataset ID: {dataset_id}")
-            
-            # Open the dataset in a new tab
-            print("Opening dataset in a new tab...")
-            driver.execute_script(f"window.open('{dataset_url}');")
-            time.sleep(0.5)
-            
-            # Switch to the new tab (this will be the dataset tab)
-            dataset_tab = driver.window_handles[-1]
-            driver.switch_to.window(dataset_tab)
-            time.sleep(0.5)
-            
-            # Wait for the dataset page to fully load by checking for specific elements
-            print("Waiting for dataset page to fully load...")
-            
-            # Wait for URL to change to the dataset page
-            wait.until(lambda d: "ord_dataset-" in d.current_url)
-            
-            # Wait for page body to be present
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            
-            # Wait for document ready state
-            wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
-            
-            # Additional wait for any dynamic content to load
-            wait.until(EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'ord_dataset-') or contains(@class, 'dataset')]")))
-            
-            print(f"Dataset page fully loaded: {driver.current_url}")
-            
-            # Scroll to the very bottom of the page to load all content
-            print("\nScrolling to the very bottom of the page...")
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            while True:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(0.5)
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-            print("Reached the very bottom of the page.")
-            
-            # Change pagination to 100 entries per page
-            print("\nLooking for pagination select dropdown...")
-            try:
-                # Wait for the select element to be present
-                select_element = wait.until(
-                    EC.presence_of_element_located((By.XPATH, "//select[@name='pagination']"))
-                )
-                print("Found pagination select dropdown, selecting value 100...")
-                
-                # Use Select class to interact with the dropdown
-                select = Select(select_element)
-                select.select_by_value("100")
-                
-                time.sleep(0.5)
-                print("Selected 100 entries per page.")
-            except Exception as e:
-                print(f"Could not select pagination option: {e}")
-            
-            # Scroll back to the top of the page
-            print("\nScrolling back to the top of the page...")
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.5)
-            
-            # Wait for View Full Details buttons to be present
-            print("\nWaiting for 'View Full Details' buttons to load...")
-            try:
-                wait.until(
-                    EC.presence_of_element_located((By.XPATH, "//button[contains(@data-v, '') and text()='View Full Details']"))
-                )
-                print("View Full Details buttons are now present.")
-            except Exception as e:
-                print(f"Timeout waiting for View Full Details buttons: {e}")
-            
-            # Find all View Full Details buttons on the dataset page
-            print("Looking for all 'View Full Details' buttons...")
-            view_details_buttons = driver.find_elements(By.XPATH, "//button[contains(@data-v, '') and text()='View Full Details']")
-            total_buttons = len(view_details_buttons)
-            print(f"Found {total_buttons} total 'View Full Details' button(s)")
-            
-            # Process all View Full Details buttons on the current page
             try:
-                total_buttons_processed = 0
-                
-                print(f"\n{'='*80}")
-                print(f"Processing All View Full Details Buttons for Dataset {dataset_idx}")
-                print(f"{'='*80}")
-                
-                if total_buttons == 0:
-                    print("No buttons found.")
-                else:
-                    print(f"Starting to process {total_buttons} buttons...")
-                    # Process each button
-                    for button_idx in range(total_buttons):
-                        total_buttons_processed += 1
-                        button_num = total_buttons_processed
-                        print(f"\n[Button {button_idx + 1}/{total_buttons}] Processing button...")
-                        
-                        # Re-fetch buttons to avoid stale element
-                        view_details_buttons = driver.find_elements(By.XPATH, "//button[contains(@data-v, '') and text()='View Full Details']")
-                        
-                        if button_idx < len(view_details_buttons):
-                            button = view_details_buttons[button_idx]
-                            
-                            print(f"Opening 'View Full Details' button in new tab...")
-                            driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                            time.sleep(0.5)
-                            
-                            # Get the button's parent link or onclick URL
-                            button_url = None
-                            try:
-                                # Try to find a parent link
-                                parent_link = button.find_element(By.XPATH, "./ancestor::a")
-                                button_url = parent_link.get_attribute("href")
-                            except:
-                                pass
-                            
-                            if not button_url:
-                                try:
-                                    # Try to get onclick attribute
-                                    onclick = button.get_attribute("onclick")
-                                    if onclick:
-                                        print(f"Found onclick: {onclick}")
-                                except:
-                                    pass
-                            
-                            # If we found a URL, open it in a new tab
-                            if button_url:
-                                print(f"Opening URL in new tab: {button_url}")
-                                driver.execute_script(f"window.open('{button_url}');")
-                                time.sleep(0.5)
-                                
-                                # Switch to the new tab
-                                driver.switch_to.window(driver.window_handles[-1])
-                                time.sleep(0.5)
-                                
-                                # Process this modal's Inputs and Outcomes data
-                                process_dataset(button_num, dataset_id)
-                                
-                                # Close the tab and switch back to the dataset window
-                                print("Closing modal tab and returning to dataset page...")
-                                driver.close()
-                                driver.switch_to.window(dataset_tab)
-                                time.sleep(0.5)
-                            else:
-                                print("Could not find URL for button, skipping...")
-                
-                print(f"\n{'='*80}")
-                print(f"Completed processing {total_buttons_processed} buttons for dataset {dataset_idx}.")
-                print(f"{'='*80}")
-                
-                # Save collected data to CSV after this dataset is processed
-                if scraped_data:
-                    print(f"\n✓ Saving {len(scraped_data)} rows to CSV...")
-                    save_to_csv(scraped_data)
-                    scraped_data.clear()  # Clear for next dataset
-                    print(f"✓ Data saved to {csv_filename}")
-                
+                process_dataset_with_retry(pool, timeout, sink, dataset_url, dataset_idx, total_dataset_ids, journal,
+                                           exporter, reaction_progress, component_cache, extract_mode, prefetch)
             except Exception as e:
-                print(f"Error processing View Full Details buttons: {e}")
-            
-            # Close the dataset tab and return to the main window
-            print("\nClosing dataset tab and returning to browse page...")
-            driver.close()
-            driver.switch_to.window(driver.window_handles[0])
-            time.sleep(0.5)
+                log.warning("Dataset %s (%s) failed after retries: %s", dataset_idx, dataset_url, e)
+            progress.step()
+        sink.flush()
         
-        print(f"\n{'='*80}")
-        print(f"Completed processing all {total_dataset_ids} datasets.")
-        print(f"✓ All data has been saved to {csv_filename}")
-        print(f"{'='*80}")
+        log.info("Completed processing all %s datasets.", total_dataset_ids)
+        log.info("✓ All data has been saved to %s", sink.filename)
         
-        print("Press Ctrl+C to exit.")
+        totals = waits.wait_totals()
+        log.info("Waited %.1f s over %s event waits (%s timed out).", totals['seconds'], totals['calls'], totals['timeouts'])
         
-        while True:
-            time.sleep(0.5)
+        # Keep a visible browser open for inspection; a headless one has nothing to show
+        if keep_open and not headless:
+            log.info("Press Ctrl+C to exit.")
+            while True:
+                time.sleep(0.5)
         
     finally:
-        driver.quit()
+        watchdog.stop()
+        # Flush before closing the journal so pending units still get marked
+        sink.close()
+        journal.close()
+        if exporter is not None:
+            exporter.close()
+        retries = ratecontrol.policy().summary()
+        if retries["retried"] or retries["failed"]:
+            log.warning("%s retried attempt(s), %s unit(s) failed after retries", retries["retried"], retries["failed"])
+        if component_cache is not None and component_cache.hits + component_cache.misses:
+            log.info("Component cache: %s hits, %s misses (%s cached)",
+                     component_cache.hits, component_cache.misses, len(component_cache))
+        pool.close()
+        metrics.report("scraped_data")
 
 
 def main() -> None:
@@ -725,11 +596,64 @@ def main() -> None:
         description="Selenium scraper to visit all dataset IDs on open-reaction-database.org"
     )
     parser.add_argument("--headless", action="store_true", help="Run Chrome in headless mode")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of parallel browser sessions to shard datasets across (default: 1)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip units finished in a previous run (see scraped_data.journal.sqlite) and append new rows")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="csv writes scraped_data.csv; parquet writes typed columns to scraped_data.parquet "
+                             "(requires pyarrow)")
+    parser.add_argument("--dataset-export-url",
+                        help="URL template returning a whole dataset as JSON, e.g. 'http://host/{dataset_id}.json'; "
+                             "falls back to the browser walk when unavailable")
+    parser.add_argument("--reaction-export-url",
+                        help="URL template returning one reaction as JSON, e.g. 'http://host/{reaction_id}.json'; "
+                             "falls back to clicking the '<>' buttons when unavailable")
+    parser.add_argument("--component-cache", type=int, default=0, metavar="N",
+                        help="Remember up to N parsed components and skip the modal of components already seen, "
+                             "e.g. %d; components are matched on section and visible card text, so two with the "
+                             "same card but a different payload share one entry (default: %%(default)s, off)"
+                             % ord_cache.DEFAULT_SIZE)
+    parser.add_argument("--extract", choices=["snapshot", "clicks"], default="clicks",
+                        help="clicks opens every tab and modal from Python; snapshot reads each reaction page with "
+                             "one injected script, falling back to clicks when it fails (experimental; "
+                             "default: %(default)s)")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Start loading the next reaction in a background tab while the current one is extracted")
+    parser.add_argument("--no-lean", action="store_true",
+                        help="Load pages in full instead of blocking images, fonts, media and analytics")
+    parser.add_argument("--lean-profile", metavar="JSON",
+                        help="Lean page-load profile to use instead of the default (see scraper_helpers/browser.py)")
+    parser.add_argument("--base-url", default=ORD_URL,
+                        help="Site to scrape, e.g. a local fixture server (default: %(default)s)")
+    parser.add_argument("--exit-when-done", action="store_true",
+                        help="Exit after the last dataset instead of waiting for Ctrl+C")
+    ratecontrol.add_arguments(parser)
+    browser.add_arguments(parser)
+    jobqueue.add_arguments(parser)
+    watchdog.add_arguments(parser)
+    logs.add_arguments(parser)
     args = parser.parse_args()
+    logs.setup(args.log_level)
+    ratecontrol.configure(args.retries, args.retry_delay)
+    browser.configure(args.max_pages, args.max_browser_mb)
 
-    scrape_all_datasets(headless=args.headless)
+    # A service appends to its output and journal across restarts
+    job_queue = jobqueue.JobQueue(args.serve) if args.serve else None
+    try:
+        scrape_all_datasets(headless=args.headless, workers=args.workers, resume=args.resume or job_queue is not None,
+                            output_format=args.format, dataset_export_url=args.dataset_export_url,
+                            reaction_export_url=args.reaction_export_url,
+                            profile=browser.load_profile(args.lean_profile, not args.no_lean),
+                            progress_every=args.progress_every, base_url=args.base_url,
+                            keep_open=not args.exit_when_done, component_cache_size=args.component_cache,
+                            extract_mode=args.extract, prefetch=args.prefetch,
+                            job_queue=job_queue, poll=args.poll, idle_exit=args.idle_exit,
+                            watchdog_limits=watchdog.limits_from_args(args))
+    finally:
+        if job_queue is not None:
+            job_queue.close()
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,168 @@
+"""End-to-end scraper benchmark against the offline fixture server.
+
+    python benchmarks/bench_e2e.py [--latency-ms 20] [--scenarios crd-http crd-frontier ...]
+                                   [--save results.json] [--baseline results.json --tolerance 0.2]
+
+Each scenario runs one scraper as a subprocess in a scratch directory against
+a local fixture server (generated with make_fixtures.py unless --fixtures is
+given) and reports wall time, rows saved, rows/sec and peak RSS. With
+--baseline the run fails (exit 1) when a scenario saves a different number of
+rows or gets slower than the baseline by more than --tolerance. Scenarios that
+need Chrome are skipped when no Chrome binary is found.
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+import fixture_server
+import make_fixtures
+
+CRD_SCRIPT = os.path.join(REPO_DIR, "CRD_SCRAPER", "CRD.PY")
+ORD_SCRIPT = os.path.join(REPO_DIR, "ORD_SCRAPER", "ORD_SCRAPER.py")
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+
+
+def scenarios(base_url: str) -> dict:
+    """name -> (command, output CSV, fixture row key, needs Chrome)."""
+    archive = f"{base_url}/archive/"
+    ord_args = [sys.executable, ORD_SCRIPT, "--headless", "--exit-when-done", "--base-url", base_url]
+    return {
+        "crd-http": ([sys.executable, CRD_SCRIPT, "--engine", "http", "--archive-url", archive],
+                     "scraped_smiles_data.csv", "crd", False),
+        "crd-frontier": ([sys.executable, CRD_SCRIPT, "--engine", "http", "--concurrency", "8",
+                          "--archive-url", archive], "scraped_smiles_data.csv", "crd", False),
+        "crd-adaptive": ([sys.executable, CRD_SCRIPT, "--engine", "http", "--concurrency", "8", "--per-host", "8",
+                          "--adaptive", "--archive-url", archive], "scraped_smiles_data.csv", "crd", False),
+        "crd-selenium": ([sys.executable, CRD_SCRIPT, "--engine", "selenium", "--archive-url", archive],
+                         "scraped_smiles_data.csv", "crd", True),
+        "crd-prefetch": ([sys.executable, CRD_SCRIPT, "--engine", "selenium", "--prefetch", "--archive-url", archive],
+                         "scraped_smiles_data.csv", "crd", True),
+        "ord": (ord_args, "scraped_data.csv", "ord", True),
+        "ord-prefetch": (ord_args + ["--prefetch"], "scraped_data.csv", "ord", True),
+        "ord-snapshot": (ord_args + ["--extract", "snapshot"], "scraped_data.csv", "ord", True),
+        "ord-workers": (ord_args + ["--workers", "3"], "scraped_data.csv", "ord", True),
+        "ord-export": (ord_args + ["--dataset-export-url", f"{base_url}/api/dataset/{{dataset_id}}.json"],
+                       "scraped_data.csv", "ord", True),
+    }
+
+
+def have_chrome() -> bool:
+    return bool(os.environ.get("CHROMEDRIVER")) or any(shutil.which(name) for name in CHROME_BINARIES)
+
+
+def count_rows(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, newline="", encoding="utf-8") as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def run(command: list, workdir: str) -> dict:
+    """Run `command` in `workdir`; wall time, exit status and peak RSS of the child."""
+    start = time.perf_counter()
+    with open(os.path.join(workdir, "output.log"), "w") as log_file:
+        process = subprocess.Popen(command, cwd=workdir, stdout=log_file, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "seconds": time.perf_counter() - start,
+        "exit_code": process.returncode,
+        "peak_rss_mb": usage.ru_maxrss / 1024,  # KiB on Linux
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regression messages for scenarios present in both runs."""
+    problems = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or result.get("skipped") or before.get("skipped"):
+            continue
+        if result["rows"] != before["rows"]:
+            problems.append(f"{name}: {result['rows']} rows, baseline saved {before['rows']}")
+        if result["seconds"] > before["seconds"] * (1 + tolerance):
+            problems.append(f"{name}: {result['seconds']:.2f} s, baseline {before['seconds']:.2f} s "
+                            f"(+{result['seconds'] / before['seconds'] - 1:.0%})")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["crd-http", "crd-frontier", "crd-selenium", "ord"])
+    parser.add_argument("--fixtures", help="Existing fixture directory (default: generate one)")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--crd-links", type=int, default=20)
+    parser.add_argument("--ord-datasets", type=int, default=5)
+    parser.add_argument("--save", metavar="JSON", help="Write the results to this file")
+    parser.add_argument("--baseline", metavar="JSON", help="Fail on regressions against a saved run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="scraper-bench-")
+    fixtures = args.fixtures
+    if fixtures is None:
+        fixtures = os.path.join(scratch, "fixtures")
+        make_fixtures.build(fixtures, crd_links=args.crd_links, ord_datasets=args.ord_datasets)
+    with open(os.path.join(fixtures, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+
+    server, base_url = fixture_server.serve(fixtures, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                                            error_rate=args.error_rate)
+    available = scenarios(base_url)
+    chrome = have_chrome()
+    results = {}
+    try:
+        for name in args.scenarios:
+            command, output, fixture_key, needs_chrome = available[name]
+            if needs_chrome and not chrome:
+                results[name] = {"skipped": "Chrome not found"}
+                continue
+            workdir = os.path.join(scratch, name)
+            os.makedirs(workdir)
+            result = run(command, workdir)
+            result["rows"] = count_rows(os.path.join(workdir, output))
+            result["expected_rows"] = expected[fixture_key]
+            result["rows_per_second"] = result["rows"] / result["seconds"] if result["seconds"] else 0.0
+            results[name] = result
+    finally:
+        server.shutdown()
+
+    print(f"Fixtures: {fixtures}  latency {args.latency_ms:.0f} +/- {args.jitter_ms:.0f} ms  logs: {scratch}")
+    print(f"{'scenario':<14} {'wall s':>8} {'rows':>7} {'expected':>9} {'rows/s':>9} {'peak MB':>8} {'exit':>5}")
+    for name, result in results.items():
+        if result.get("skipped"):
+            print(f"{name:<14} skipped: {result['skipped']}")
+            continue
+        print(f"{name:<14} {result['seconds']:>8.2f} {result['rows']:>7} {result['expected_rows']:>9}"
+              f" {result['rows_per_second']:>9.1f} {result['peak_rss_mb']:>8.1f} {result['exit_code']:>5}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [f"{name}: exit code {r['exit_code']}" for name, r in results.items()
+              if not r.get("skipped") and r["exit_code"] != 0]
+    failed += [f"{name}: saved {r['rows']} of {r['expected_rows']} rows" for name, r in results.items()
+               if not r.get("skipped") and r["rows"] != r["expected_rows"]]
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failed += compare(results, json.load(f), args.tolerance)
+    for problem in failed:
+        print(f"REGRESSION {problem}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
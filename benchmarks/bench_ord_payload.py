@@ -0,0 +1,70 @@
+"""Micro-benchmark: single-pass ORD <pre> parsing vs the old str.find scanning.
+
+    python benchmarks/bench_ord_payload.py [--identifiers 2000] [--repeat 5]
+
+Below a few hundred identifiers the old scan is the faster one (speedup < 1x).
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper_helpers import ord_payload
+
+
+def legacy_extract(pre_text: str) -> list:
+    """The extraction process_dataset used before ord_payload (identifier branch + role)."""
+    rows = []
+    if 'identifiers' in pre_text:
+        identifier_values = []
+        search_start = 0
+        while True:
+            value_pos = pre_text.find('"value":', search_start)
+            if value_pos == -1:
+                break
+            value_start = value_pos + len('"value":')
+            value_part = pre_text[value_start:].strip()
+            if value_part.startswith('"'):
+                value_end = value_part.find('"', 1)
+                if value_end > 0:
+                    identifier_values.append(value_part[1:value_end])
+            search_start = value_start + 1
+        for idx, val in enumerate(identifier_values, 1):
+            rows.append(('identifier', val, idx))
+    if 'reaction_role:' in pre_text:
+        role_start = pre_text.find('reaction_role:') + len('reaction_role:')
+        rows.append(('reaction_role', pre_text[role_start:].strip().split()[0].strip(), 1))
+    return rows
+
+
+def make_payload(identifiers: int) -> str:
+    entries = ",\n".join(
+        f'    {{"type": "SMILES", "value": "CC(=O)OC{i}c1ccccc1"}}' for i in range(identifiers)
+    )
+    return (
+        '{\n  "identifiers": [\n' + entries + '\n  ],\n'
+        '  "amount": {"moles": {"value": 5.0, "units": "MILLIMOLE"}}\n}\n'
+        'reaction_role: REACTANT\n'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--identifiers", type=int, nargs="+", default=[1, 10, 200, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'identifiers':>12} {'bytes':>10} {'legacy ms':>10} {'single-pass ms':>15} {'speedup':>8}")
+    for count in args.identifiers:
+        payload = make_payload(count)
+        assert [r for r in legacy_extract(payload)] == ord_payload.extract_rows([payload])
+        number = max(1, 2000 // count)
+        legacy = min(timeit.repeat(lambda: legacy_extract(payload), number=number, repeat=args.repeat)) / number
+        single = min(timeit.repeat(lambda: ord_payload.extract_rows([payload]), number=number, repeat=args.repeat)) / number
+        print(f"{count:>12} {len(payload):>10} {legacy * 1000:>10.3f} {single * 1000:>15.3f} {legacy / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
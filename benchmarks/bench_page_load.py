@@ -0,0 +1,86 @@
+"""Page-load benchmark: bytes transferred and load time per page, with and without the lean profile.
+
+    python benchmarks/bench_page_load.py [URL ...] [--repeat 3] [--lean-profile profile.json] [--headless]
+
+Bytes come from Chrome's DevTools network log (encoded bytes of every finished
+request); blocked requests are counted separately. Load time is the wall time
+of driver.get, which returns at DOMContentLoaded under the eager strategy.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper_helpers import browser
+
+DEFAULT_URLS = [
+    "https://open-reaction-database.org/browse",
+    "https://kmt.vander-lingen.nl/archive",
+]
+
+
+def network_stats(driver) -> dict:
+    """Sum the DevTools network events logged since the last call."""
+    transferred = requests = blocked = 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.loadingFinished":
+            transferred += message["params"].get("encodedDataLength", 0)
+            requests += 1
+        elif message["method"] == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            blocked += 1
+    return {"bytes": transferred, "requests": requests, "blocked": blocked}
+
+
+def measure(profile, urls: list, repeat: int, headless: bool) -> dict:
+    """Load every URL `repeat` times in fresh tabs; return per-URL samples."""
+    driver = browser.create_driver(headless, profile, log_network=True)
+    results = {url: [] for url in urls}
+    try:
+        for _ in range(repeat):
+            for url in urls:
+                driver.switch_to.new_window("tab")
+                browser.block_resources(driver)
+                driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+                network_stats(driver)  # drop events from earlier pages
+                start = time.perf_counter()
+                driver.get(url)
+                elapsed = time.perf_counter() - start
+                stats = network_stats(driver)
+                stats["seconds"] = elapsed
+                results[url].append(stats)
+                driver.close()
+                driver.switch_to.window(driver.window_handles[0])
+    finally:
+        driver.quit()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("urls", nargs="*", default=DEFAULT_URLS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lean-profile", metavar="JSON", help="Profile to compare against full page loads")
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    profiles = {"full": None, "lean": browser.load_profile(args.lean_profile)}
+    results = {name: measure(profile, args.urls, args.repeat, args.headless) for name, profile in profiles.items()}
+
+    print(f"{'url':<45} {'profile':>7} {'KiB':>9} {'requests':>9} {'blocked':>8} {'load ms':>9}")
+    for url in args.urls:
+        for name in profiles:
+            samples = results[name][url]
+            print(f"{url[:45]:<45} {name:>7}"
+                  f" {statistics.median(s['bytes'] for s in samples) / 1024:>9.1f}"
+                  f" {statistics.median(s['requests'] for s in samples):>9.0f}"
+                  f" {statistics.median(s['blocked'] for s in samples):>8.0f}"
+                  f" {statistics.median(s['seconds'] for s in samples) * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
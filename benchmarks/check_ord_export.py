@@ -0,0 +1,95 @@
+"""Chrome-free check of the ORD bulk export path against the offline fixtures.
+
+    python benchmarks/check_ord_export.py [--fixtures DIR] [--ord-datasets 5]
+
+Serves a fixture tree (generated with make_fixtures.py unless --fixtures is
+given), runs ORD_SCRAPER.process_dataset_url with a dataset exporter for
+every dataset on the Browse page, and checks that scraped_data.csv has the
+ORD columns and the expected number of rows. The reaction export is checked
+to give the same rows as the dataset export. The export branch returns
+before touching the browser, so no driver is started. Exits 1 on a mismatch.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "ORD_SCRAPER"))
+import fixture_server
+import make_fixtures
+import ORD_SCRAPER
+from scraper_helpers import journal as crawl_journal, ord_export
+from scraper_helpers.sinks import ORD_SCHEMA, CsvRowSink
+
+ORD_COLUMNS = [name for name, _ in ORD_SCHEMA]
+
+
+def run_export(base_url: str, workdir: str) -> tuple:
+    """(header, data rows, problems) of a scraped_data.csv written through the dataset export."""
+    exporter = ord_export.OrdExporter(f"{base_url}/api/dataset/{{dataset_id}}.json",
+                                      f"{base_url}/api/reaction/{{reaction_id}}.json")
+    csv_path = os.path.join(workdir, "scraped_data.csv")
+    sink = CsvRowSink(csv_path, ORD_COLUMNS)
+    journal = crawl_journal.CrawlJournal(os.path.join(workdir, "scraped_data.journal.sqlite"))
+    try:
+        browse = exporter.session.get(f"{base_url}/browse/", timeout=ord_export.REQUEST_TIMEOUT).text
+        dataset_urls = [f"{base_url}{path}" for path in re.findall(r'href="(/dataset/ord_dataset-[0-9a-f]+)"', browse)]
+        for dataset_idx, dataset_url in enumerate(dataset_urls, 1):
+            ORD_SCRAPER.process_dataset_url(None, None, sink, dataset_url, dataset_idx, len(dataset_urls),
+                                            journal=journal, exporter=exporter)
+        problems = []
+        for dataset_url in dataset_urls[:1]:
+            for reaction in exporter.dataset_reactions(dataset_url.split("/")[-1]):
+                by_reaction = exporter.reaction_rows(f"{base_url}/id/{reaction['reaction_id']}")
+                if by_reaction != ord_export.reaction_rows(reaction):
+                    problems.append(f"{reaction['reaction_id']}: reaction export differs from the dataset export")
+    finally:
+        sink.close()
+        journal.close()
+        exporter.close()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        return next(reader, None), list(reader), problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", help="Existing fixture directory (default: generate one)")
+    parser.add_argument("--ord-datasets", type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="ord-export-check-")
+    fixtures = args.fixtures
+    if fixtures is None:
+        fixtures = os.path.join(scratch, "fixtures")
+        make_fixtures.build(fixtures, ord_datasets=args.ord_datasets)
+    with open(os.path.join(fixtures, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)["ord"]
+
+    server, base_url = fixture_server.serve(fixtures)
+    try:
+        header, rows, problems = run_export(base_url, scratch)
+    finally:
+        server.shutdown()
+
+    if header != ORD_COLUMNS:
+        problems.append(f"columns {header}, expected {ORD_COLUMNS}")
+    if len(rows) != expected:
+        problems.append(f"saved {len(rows)} rows, expected {expected}")
+    problems += [f"row {n}: {len(row)} fields" for n, row in enumerate(rows, 2) if len(row) != len(ORD_COLUMNS)][:5]
+    print(f"ORD export: {len(rows)} rows of {expected} expected, columns {header}  (output in {scratch})")
+    if problems:
+        print("FAILED:\n  " + "\n  ".join(problems))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Chrome-free check of the event waits in scraper_helpers/waits.py.
+
+    python benchmarks/check_waits.py [--event-after 0.3] [--timeout 2]
+
+Runs every wait helper through the real WebDriverWait and expected
+conditions against a fake driver whose page changes `--event-after` seconds
+in: the modal is added and shown, the `<pre>` fills, the tab class changes,
+the old buttons detach, the window opens, and so on. Each helper has to return a
+truthy result soon after the change (well before `--timeout`). Each helper
+is also checked against a page that never changes and has to return
+None/False at its timeout instead of raising. This covers the wait layer the
+Selenium paths of both scrapers call. It does not measure their wall-clock
+time, which needs Chrome (bench_e2e.py). Exits 1 on a failure.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper_helpers import waits
+
+# How long a helper may take past the event before it counts as sleeping rather than waiting
+SLACK = 0.25
+
+
+class FakeElement:
+    def __init__(self, page, text="", css_class="", shown=True):
+        self.page = page
+        self._text = text
+        self._class = css_class
+        self._shown = shown
+
+    @property
+    def text(self):
+        return self._text() if callable(self._text) else self._text
+
+    def is_displayed(self):
+        return self._shown() if callable(self._shown) else self._shown
+
+    def is_enabled(self):
+        if self.page.changed():
+            raise StaleElementReferenceException("element is not attached to the page document")
+        return True
+
+    def get_attribute(self, name):
+        if name != "class":
+            return None
+        return self._class() if callable(self._class) else self._class
+
+
+class FakePage:
+    """Driver stand-in whose DOM switches from "before" to "after" once `event_after` seconds have passed.
+
+    A page built with event_after=None never changes.
+    """
+
+    def __init__(self, event_after):
+        self.event_after = event_after
+        self.started = time.monotonic()
+        self.old_button = FakeElement(self)
+        self.tab = FakeElement(self, css_class=lambda: "tab active" if self.changed() else "tab")
+
+    def changed(self) -> bool:
+        return self.event_after is not None and time.monotonic() - self.started >= self.event_after
+
+    def find_elements(self, by, value):
+        if (by, value) == (By.XPATH, "//pre"):
+            return [FakeElement(self, text=lambda: "{\"smiles\": \"CCO\"}" if self.changed() else "")]
+        if (by, value) == (By.CSS_SELECTOR, ".modal-body"):
+            return [FakeElement(self, shown=self.changed)]
+        if (by, value) == (By.CSS_SELECTOR, ".modal-content"):
+            return [FakeElement(self)] if self.changed() else []
+        if (by, value) == (By.CSS_SELECTOR, ".spinner"):
+            return [] if self.changed() else [FakeElement(self)]
+        if (by, value) == (By.CSS_SELECTOR, ".button"):
+            return [FakeElement(self)] * (4 if self.changed() else 2)
+        return []
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"no element for {by}={value}")
+        return elements[0]
+
+    @property
+    def window_handles(self):
+        return ["main", "detail"] if self.changed() else ["main"]
+
+    def execute_script(self, script, *args):
+        if script == "return document.readyState":
+            return "complete" if self.changed() else "interactive"
+        raise NotImplementedError(script)
+
+
+CHECKS = [
+    ("wait_for_presence", lambda d, t: waits.wait_for_presence(d, (By.CSS_SELECTOR, ".modal-content"), t)),
+    ("wait_for_visible", lambda d, t: waits.wait_for_visible(d, (By.CSS_SELECTOR, ".modal-body"), t)),
+    ("wait_for_gone", lambda d, t: waits.wait_for_gone(d, (By.CSS_SELECTOR, ".spinner"), t)),
+    ("wait_for_stale", lambda d, t: waits.wait_for_stale(d, d.old_button, t)),
+    ("wait_for_pre_text", lambda d, t: waits.wait_for_pre_text(d, t)),
+    ("wait_for_class_change", lambda d, t: waits.wait_for_class_change(d, d.tab, "tab", t)),
+    ("wait_for_new_window", lambda d, t: waits.wait_for_new_window(d, ["main"], t)),
+    ("wait_for_document_ready", lambda d, t: waits.wait_for_document_ready(d, t)),
+    ("wait_for_count_change", lambda d, t: waits.wait_for_count_change(d, (By.CSS_SELECTOR, ".button"), 2, t)),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--event-after", type=float, default=0.3, metavar="SECONDS",
+                        help="When the fake page changes (default: 0.3)")
+    parser.add_argument("--timeout", type=float, default=2.0, metavar="SECONDS",
+                        help="Timeout given to each wait (default: 2.0)")
+    args = parser.parse_args()
+
+    problems = []
+    print(f"{'helper':<24} {'result':>24} {'returned s':>11} {'no-event s':>11}")
+    for name, check in CHECKS:
+        page = FakePage(args.event_after)
+        result = check(page, args.timeout)
+        returned = time.monotonic() - page.started
+        never = FakePage(None)
+        missed = check(never, args.event_after)
+        gave_up = time.monotonic() - never.started
+        print(f"{name:<24} {str(result)[:24]:>24} {returned:>11.3f} {gave_up:>11.3f}")
+        if not result:
+            problems.append(f"{name}: returned {result!r} although the page changed")
+        elif not args.event_after <= returned <= args.event_after + SLACK:
+            problems.append(f"{name}: returned after {returned:.3f} s for an event at {args.event_after} s")
+        if missed:
+            problems.append(f"{name}: returned {missed!r} on a page that never changed")
+
+    totals = waits.wait_totals()
+    print(f"{totals['calls']} waits, {totals['timeouts']} timed out, {totals['seconds']:.2f} s in total")
+    if totals["timeouts"] != len(CHECKS):
+        problems.append(f"{totals['timeouts']} timeouts counted, expected {len(CHECKS)}")
+    if problems:
+        print("FAILED:\n  " + "\n  ".join(problems))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
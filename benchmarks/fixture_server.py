@@ -0,0 +1,123 @@
+"""Local replay server for saved CRD / ORD pages, with configurable latency.
+
+    python benchmarks/fixture_server.py FIXTURE_DIR [--port 8765] [--latency-ms 50] [--jitter-ms 10] [--error-rate 0.05]
+    python benchmarks/fixture_server.py FIXTURE_DIR capture URL [URL ...]
+
+A request for /a/b is answered with FIXTURE_DIR/a/b, FIXTURE_DIR/a/b/index.html
+or FIXTURE_DIR/a/b.json, whichever exists; every response is delayed by
+latency +/- jitter to stand in for the real sites, and a share of requests
+can be answered with 503 to exercise retries. `capture` saves pages from
+a live site into the same layout (server-rendered pages only: the ORD views
+are built by JavaScript, so use make_fixtures.py for those).
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper_helpers import crd_http
+
+CONTENT_TYPES = {".json": "application/json", ".js": "text/javascript", ".css": "text/css"}
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    root = "."
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+
+    def _resolve(self):
+        path = unquote(urlsplit(self.path).path)
+        base = os.path.normpath(os.path.join(self.root, *[p for p in path.split("/") if p not in ("", "..")]))
+        for candidate in (base, os.path.join(base, "index.html"), base + ".json"):
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def do_GET(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_error(503, "Injected failure")
+            return
+        path = self._resolve()
+        if path is None:
+            self.send_error(404, "No fixture for this path")
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES.get(os.path.splitext(path)[1], "text/html; charset=utf-8"))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(root: str, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+          error_rate: float = 0.0):
+    """Start the server on a background thread; returns (server, base_url). Stop it with server.shutdown()."""
+    handler = type("Handler", (FixtureHandler,), {"root": os.path.abspath(root), "latency": latency,
+                                                  "jitter": jitter, "error_rate": error_rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def capture(root: str, urls: list) -> None:
+    """Save each URL's body under `root` at its path (directories get index.html)."""
+    session = crd_http.create_session()
+    try:
+        for url in urls:
+            path = urlsplit(url).path.strip("/")
+            target = os.path.join(root, *path.split("/")) if path else root
+            if not os.path.splitext(target)[1]:
+                target = os.path.join(target, "index.html")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(crd_http.fetch(session, url))
+            print(f"Saved {url} -> {target}")
+    finally:
+        session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="Fixture directory (see make_fixtures.py)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- variation of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    sub = parser.add_subparsers(dest="command")
+    capture_parser = sub.add_parser("capture", help="Save live pages into the fixture directory")
+    capture_parser.add_argument("urls", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "capture":
+        capture(args.root, args.urls)
+        return
+
+    server, base_url = serve(args.root, args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000,
+                             args.error_rate)
+    print(f"Serving {args.root} at {base_url} (latency {args.latency_ms:.0f} +/- {args.jitter_ms:.0f} ms)")
+    print(f"  CRD: --archive-url {base_url}/archive/")
+    print(f"  ORD: --base-url {base_url} --dataset-export-url '{base_url}/api/dataset/{{dataset_id}}.json'")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
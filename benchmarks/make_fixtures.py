@@ -0,0 +1,263 @@
+"""Generate an offline fixture tree for fixture_server.py.
+
+    python benchmarks/make_fixtures.py OUT_DIR [--crd-links 20] [--ord-datasets 5] [--seed 1]
+
+The pages reproduce the markup the scrapers rely on, so both can be crawled
+end to end without network access:
+
+    /archive/                       CRD archive with 'reaction data' links
+    /reaction/<doi>/[start/<N>]     CRD product pages with SMILES buttons and Next links
+    /  /browse/                     ORD landing page and Browse listing
+    /dataset/<ord_dataset-id>/      ORD dataset page (Vue-style state + rendered links)
+    /id/<ord-id>/                   ORD reaction view with Inputs/Outcomes tabs and '<>' modals
+    /api/dataset/<id>.json          ORD dataset export (--dataset-export-url)
+    /api/reaction/<id>.json         ORD reaction export (--reaction-export-url)
+
+Saved pages from the live sites can be dropped into the same tree instead;
+the server serves whatever is there.
+"""
+
+import argparse
+import json
+import os
+import random
+from html import escape
+
+ATOMS = ["C", "CC", "O", "N", "c1ccccc1", "C(=O)O", "Cl", "Br", "CN", "OC"]
+
+ORD_DETAIL_JS = r"""
+const root = document.getElementById('app');
+function componentText(component) {
+    return JSON.stringify(component, null, 2) + '\nreaction_role: ' + (component.reaction_role || 'UNSPECIFIED');
+}
+function openModal(component) {
+    const modal = document.createElement('div');
+    modal.className = 'modal';
+    modal.innerHTML = '<div class="close">x</div><pre></pre>';
+    document.body.appendChild(modal);
+    setTimeout(() => { modal.querySelector('pre').textContent = componentText(component); }, 5);
+    modal.querySelector('.close').onclick = () => modal.remove();
+}
+function renderTabs(container, names, contentClass, componentsFor) {
+    const tabs = document.createElement('div');
+    tabs.className = 'tabs';
+    const content = document.createElement('div');
+    content.className = contentClass;
+    names.forEach((name, i) => {
+        const tab = document.createElement('div');
+        tab.className = i === 0 ? 'tab active' : 'tab';
+        tab.textContent = name;
+        tab.onclick = () => {
+            tabs.querySelectorAll('div').forEach(t => t.className = 'tab');
+            tab.className = 'tab active';
+            show(i);
+        };
+        tabs.appendChild(tab);
+    });
+    function show(i) {
+        content.innerHTML = '';
+        componentsFor(i).forEach(component => {
+            // Component card: visible summary plus the '<>' button that opens the full payload
+            const card = document.createElement('div');
+            card.className = 'component';
+            const summary = document.createElement('span');
+            summary.textContent = component.identifiers.map(identifier => identifier.value).join(' ')
+                + ' ' + component.amount.moles.value + ' ' + component.amount.moles.units;
+            const button = document.createElement('div');
+            button.className = 'button';
+            button.textContent = '<>';
+            button.onclick = () => openModal(component);
+            card.appendChild(summary);
+            card.appendChild(button);
+            content.appendChild(card);
+        });
+    }
+    container.appendChild(tabs);
+    container.appendChild(content);
+    show(0);
+}
+const nav = document.createElement('div');
+nav.innerHTML = '<div class="nav-item">inputs</div><div class="nav-item">outcomes</div>';
+root.appendChild(nav);
+const inputNames = Object.keys(REACTION.inputs);
+const products = REACTION.outcomes.flatMap(outcome => outcome.products);
+nav.children[0].onclick = () => {
+    if (document.getElementById('inputs')) return;
+    const section = document.createElement('div');
+    section.id = 'inputs';
+    root.appendChild(section);
+    renderTabs(section, inputNames, 'input', i => REACTION.inputs[inputNames[i]].components);
+};
+nav.children[1].onclick = () => {
+    if (document.getElementById('outcomes')) return;
+    const section = document.createElement('div');
+    section.id = 'outcomes';
+    section.innerHTML = '<div class="title">Products</div>';
+    const sub = document.createElement('div');
+    sub.className = 'sub-section';
+    section.appendChild(sub);
+    root.appendChild(section);
+    renderTabs(sub, products.map((p, i) => 'Product ' + (i + 1)), 'product', i => [products[i]]);
+};
+"""
+
+ORD_DATASET_JS = r"""
+const app = document.getElementById('app');
+app.__vue_app__ = {_instance: {setupState: {reactions: REACTIONS.map(id => ({reaction_id: id}))}, props: {}, data: {}}};
+const list = document.getElementById('list');
+function render(pageSize) {
+    list.innerHTML = '';
+    REACTIONS.slice(0, pageSize).forEach(id => {
+        const a = document.createElement('a');
+        a.href = '/id/' + id;
+        a.innerHTML = '<button data-v-1>View Full Details</button>';
+        list.appendChild(a);
+    });
+}
+document.querySelector("select[name='pagination']").onchange = e => render(parseInt(e.target.value));
+render(10);
+"""
+
+
+def _write(root: str, path: str, content: str) -> None:
+    full = os.path.join(root, *path.strip("/").split("/"))
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _smiles(rng) -> str:
+    part = lambda: ".".join(rng.choice(ATOMS) for _ in range(rng.randint(1, 3)))
+    return f"{part()}>{part()}>{part()}"
+
+
+def _crd_page(total, smiles_list, next_url, next_product_url) -> str:
+    buttons = "\n".join(
+        f'<button class="btn btn-outline-success btn-sm" data-reaction-smiles="{escape(s)}">SMILES</button>'
+        for s in smiles_list
+    )
+    links = ""
+    if next_url:
+        links += f'<ul class="pagination"><li><a href="{next_url}">Next</a></li></ul>\n'
+    if next_product_url:
+        links += f'<a class="btn btn-primary" href="{next_product_url}">Next</a>\n'
+    return (f'<html><body>\n<button class="btn btn-info">Results <span class="badge">{total}</span></button>\n'
+            f'{buttons}\n{links}</body></html>\n')
+
+
+def build_crd(root: str, rng, links: int, products: int, smiles_per_product: int, per_page: int) -> int:
+    """Archive plus `links` reaction data links; returns the number of SMILES rows a crawl should save."""
+    rows = 0
+    archive_links = []
+    for link_idx in range(links):
+        doi = f"10.1000-bench.{link_idx}"
+        base = f"/reaction/{doi}"
+        archive_links.append(f'<li>{doi} <a href="{base}/">reaction data</a></li>')
+        offset = 0
+        for product_idx in range(products):
+            total = smiles_per_product if link_idx % 7 else 0  # every 7th link has no results
+            product_start = offset
+            for page_start in range(0, max(total, 1), per_page):
+                page_offset = product_start + page_start
+                count = min(per_page, total - page_start)
+                smiles_list = [_smiles(rng) for _ in range(max(count, 0))]
+                rows += len(smiles_list)
+                more = page_start + per_page < total
+                next_url = f"{base}/start/{page_offset + per_page}" if more else None
+                last_product = product_idx == products - 1
+                next_product_url = None
+                if not more and not last_product and total:
+                    next_product_url = f"{base}/start/{product_start + total}"
+                page_path = f"{base}/index.html" if page_offset == 0 else f"{base}/start/{page_offset}"
+                _write(root, page_path, _crd_page(total, smiles_list, next_url, next_product_url))
+                if not total:
+                    break
+            if not total:
+                break
+            offset = product_start + total
+    _write(root, "/archive/index.html",
+           "<html><body><ul>\n" + "\n".join(archive_links) + "\n</ul></body></html>\n")
+    return rows
+
+
+def _component(rng, role: str) -> dict:
+    smiles = ".".join(rng.choice(ATOMS) for _ in range(rng.randint(1, 2)))
+    return {
+        "identifiers": [{"type": "SMILES", "value": smiles}, {"type": "NAME", "value": f"compound-{rng.randint(1, 10**3)}"}],
+        "amount": {"moles": {"value": round(rng.uniform(0.1, 10), 2), "units": "MILLIMOLE"}},
+        "reaction_role": role,
+    }
+
+
+def _reaction(rng, reaction_id: str, inputs: int, reagents: list) -> dict:
+    # Later inputs draw from a shared pool, as datasets reuse the same reagents and solvents
+    components = [_component(rng, "REACTANT")] + [rng.choice(reagents) for _ in range(inputs - 1)]
+    return {
+        "reaction_id": reaction_id,
+        "inputs": {f"input {i + 1}": {"components": [component]} for i, component in enumerate(components)},
+        "outcomes": [{"products": [_component(rng, "PRODUCT")]}],
+    }
+
+
+def build_ord(root: str, rng, datasets: int, reactions: int, inputs: int) -> int:
+    """Landing, Browse, dataset and reaction pages plus JSON exports; returns the expected row count."""
+    rows = 0
+    dataset_links = []
+    reagents = [_component(rng, "REAGENT") for _ in range(8)]
+    for _ in range(datasets):
+        dataset_id = f"ord_dataset-{rng.getrandbits(128):032x}"
+        dataset_links.append(f'<li><a href="/dataset/{dataset_id}">{dataset_id}</a></li>')
+        reaction_ids = [f"ord-{rng.getrandbits(128):032x}" for _ in range(reactions)]
+        dataset_reactions = []
+        for reaction_id in reaction_ids:
+            reaction = _reaction(rng, reaction_id, inputs, reagents)
+            dataset_reactions.append(reaction)
+            rows += (inputs + 1) * 3  # two identifiers and a role per component
+            _write(root, f"/api/reaction/{reaction_id}.json", json.dumps(reaction))
+            _write(root, f"/id/{reaction_id}/index.html",
+                   f'<html><body><div id="app" data-v-app></div>\n<script>const REACTION = {json.dumps(reaction)};\n'
+                   f'{ORD_DETAIL_JS}</script></body></html>\n')
+        _write(root, f"/api/dataset/{dataset_id}.json", json.dumps({"reactions": dataset_reactions}))
+        _write(root, f"/dataset/{dataset_id}/index.html",
+               f'<html><body><div id="app" data-v-app><h1 class="dataset">{dataset_id}</h1>\n'
+               f'<p class="size">{reactions} reactions</p>\n'
+               '<select name="pagination"><option value="10">10</option><option value="100">100</option></select>\n'
+               f'<div id="list"></div></div>\n<script>const REACTIONS = {json.dumps(reaction_ids)};\n'
+               f'{ORD_DATASET_JS}</script></body></html>\n')
+    _write(root, "/browse/index.html", "<html><body><ul>\n" + "\n".join(dataset_links) + "\n</ul></body></html>\n")
+    _write(root, "/index.html", '<html><body><nav><a href="/browse/">Browse</a></nav></body></html>\n')
+    return rows
+
+
+def build(root: str, crd_links: int = 20, products: int = 2, smiles_per_product: int = 25, per_page: int = 10,
+          ord_datasets: int = 5, reactions: int = 20, inputs: int = 2, seed: int = 1) -> dict:
+    """Write the whole fixture tree under `root`; returns the row counts a full crawl should produce."""
+    rng = random.Random(seed)
+    expected = {
+        "crd": build_crd(root, rng, crd_links, products, smiles_per_product, per_page),
+        "ord": build_ord(root, rng, ord_datasets, reactions, inputs),
+    }
+    _write(root, "/expected.json", json.dumps(expected))
+    return expected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--crd-links", type=int, default=20)
+    parser.add_argument("--products", type=int, default=2, help="Product pages per reaction data link")
+    parser.add_argument("--smiles-per-product", type=int, default=25)
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--ord-datasets", type=int, default=5)
+    parser.add_argument("--reactions", type=int, default=20, help="Reactions per ORD dataset")
+    parser.add_argument("--inputs", type=int, default=2, help="Inputs per ORD reaction")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    expected = build(args.out_dir, args.crd_links, args.products, args.smiles_per_product, args.per_page,
+                     args.ord_datasets, args.reactions, args.inputs, args.seed)
+    print(f"Fixtures written to {args.out_dir}: {expected['crd']} CRD rows, {expected['ord']} ORD rows expected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""Warm, reusable Chrome sessions shared by both scrapers.
+
+`ChromeDriverManager().install()` asks the network for the latest driver on
+every call; `driver_path()` caches the resolved binary path in DRIVER_CACHE so
+later runs start without it. `DriverPool` keeps pre-configured browsers alive
+across datasets and only restarts a session once it has loaded `max_pages`
+pages or its browser processes use more than `max_memory_mb` (needs psutil).
+
+`prefetch_tab()` starts loading a page in a background tab and returns at
+once, so a scraper can keep extracting the current page while the next one
+loads; `take_prefetched()` then switches to it.
+
+Sessions use a `LeanProfile` by default: listed resource types and URL
+patterns (analytics) are blocked, pages are handed over at DOMContentLoaded
+("eager") and extensions are disabled. A profile can be loaded from JSON:
+
+    {"block_types": ["image", "font"], "block_urls": ["*analytics*"],
+     "page_load_strategy": "eager", "disable_extensions": true}
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+
+from scraper_helpers import metrics, ratecontrol, waits
+
+try:
+    import psutil
+except ImportError:  # memory-based recycling is skipped without psutil
+    psutil = None
+
+DRIVER_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "scraper_helpers", "chromedriver.json")
+MAX_PAGES = 200
+MAX_MEMORY_MB = 1500
+ACQUIRE_POLL = 0.5  # seconds a blocked acquire() waits before checking for a freed slot
+
+# Network.setBlockedURLs matches URLs, not resource types, so types map to extensions
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "stylesheet": ["*.css"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav"],
+}
+ANALYTICS_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*plausible.io*", "*matomo*",
+]
+
+
+class LeanProfile:
+    """What a scraping browser skips: the scrapers only read the DOM.
+
+    Stylesheets are not blocked by default: the visibility and clickability
+    waits depend on layout. Block them ("stylesheet") only in a profile that
+    was checked against the target pages.
+    """
+
+    def __init__(self, block_types=("image", "font", "media"), block_urls=tuple(ANALYTICS_PATTERNS),
+                 page_load_strategy: str = "eager", disable_extensions: bool = True):
+        unknown = set(block_types) - set(RESOURCE_TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown resource type(s) {sorted(unknown)}; expected {sorted(RESOURCE_TYPE_PATTERNS)}")
+        self.block_types = list(block_types)
+        self.block_urls = list(block_urls)
+        self.page_load_strategy = page_load_strategy
+        self.disable_extensions = disable_extensions
+
+    @classmethod
+    def from_json(cls, path: str) -> "LeanProfile":
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    @property
+    def blocked_urls(self) -> list:
+        patterns = [p for t in self.block_types for p in RESOURCE_TYPE_PATTERNS[t]]
+        return patterns + self.block_urls
+
+    def apply(self, options) -> None:
+        options.page_load_strategy = self.page_load_strategy
+        if self.disable_extensions:
+            options.add_argument("--disable-extensions")
+        if "image" in self.block_types:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+
+DEFAULT_PROFILE = LeanProfile()
+
+log = logging.getLogger(__name__)
+
+_pages_loaded = weakref.WeakKeyDictionary()
+_retired = weakref.WeakSet()  # sessions to restart when next released (see watchdog.py)
+
+
+def driver_path(refresh: bool = False) -> str:
+    """Path of the chromedriver binary, resolved over the network only when not cached."""
+    override = os.environ.get("CHROMEDRIVER")
+    if override:
+        return override
+    if not refresh:
+        try:
+            with open(DRIVER_CACHE, encoding="utf-8") as f:
+                cached = json.load(f)["path"]
+            if os.path.isfile(cached):
+                return cached
+        except (OSError, ValueError, KeyError):
+            pass
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(DRIVER_CACHE), exist_ok=True)
+    with open(DRIVER_CACHE, "w", encoding="utf-8") as f:
+        json.dump({"path": path}, f)
+    return path
+
+
+def load_profile(path: str = None, enabled: bool = True):
+    """The profile for --lean-profile / --no-lean: None disables it."""
+    if not enabled:
+        return None
+    return LeanProfile.from_json(path) if path else DEFAULT_PROFILE
+
+
+def block_resources(driver) -> None:
+    """Block the driver's profile URLs in the current tab (DevTools settings are per tab)."""
+    profile = getattr(driver, "scraper_profile", None)
+    if profile is None or not profile.blocked_urls:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile.blocked_urls})
+
+
+def create_driver(headless: bool = False, profile: LeanProfile = DEFAULT_PROFILE, log_network: bool = False):
+    """Start a Chrome WebDriver session; `profile=None` loads pages in full.
+
+    `log_network` records DevTools network events for `driver.get_log("performance")`.
+    """
+    options = Options()
+    if headless:
+        # Selenium 4.8+ supports the new headless flag, but fallback works too
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if profile is not None:
+        profile.apply(options)
+    if log_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    driver = webdriver.Chrome(service=Service(driver_path()), options=options)
+    if not headless:
+        driver.maximize_window()
+    driver.scraper_profile = profile
+    block_resources(driver)
+    return driver
+
+
+def open_tab(driver, url: str) -> str:
+    """Open `url` in a new tab, switch to it and return its handle.
+
+    The tab starts blank so resource blocking is in place before the page loads.
+    """
+    driver.switch_to.new_window("tab")
+    handle = driver.current_window_handle
+    block_resources(driver)
+    load(driver, url)
+    return handle
+
+
+def prefetch_tab(driver, url: str) -> str:
+    """Start loading `url` in a new background tab and return its handle without waiting for it.
+
+    The current tab stays selected. The navigation is started from a timer so
+    that chromedriver does not wait for the page load before returning.
+    """
+    current = driver.current_window_handle
+    driver.switch_to.new_window("tab")
+    handle = driver.current_window_handle
+    block_resources(driver)
+    _pages_loaded[driver] = _pages_loaded.get(driver, 0) + 1
+    driver.execute_script("var url = arguments[0]; setTimeout(function () { window.location.href = url; }, 0);", url)
+    driver.switch_to.window(current)
+    metrics.count("prefetched")
+    return handle
+
+
+def take_prefetched(driver, handle: str, url: str, timeout: float = 30) -> None:
+    """Switch to a tab started by prefetch_tab() once its page has loaded.
+
+    Falls back to loading `url` again when the prefetch failed or did not
+    finish within `timeout` seconds.
+    """
+    driver.switch_to.window(handle)
+    with metrics.timed("navigate"):
+        ready = waits.wait_until(driver, lambda d: d.execute_script(
+            "return location.href !== 'about:blank' && document.readyState !== 'loading'"), timeout)
+    if not ready or driver.current_url.startswith("chrome-error:"):
+        log.info("Prefetch of %s did not load, loading it again", url)
+        load(driver, url)
+
+
+def close_tab(driver, handle: str) -> None:
+    """Close a tab other than the current one, e.g. an unused prefetch."""
+    current = driver.current_window_handle
+    driver.switch_to.window(handle)
+    driver.close()
+    driver.switch_to.window(current)
+
+
+def _get(driver, url: str) -> None:
+    _pages_loaded[driver] = _pages_loaded.get(driver, 0) + 1
+    with metrics.timed("navigate"):
+        driver.get(url)
+
+
+def load(driver, url: str) -> None:
+    """driver.get(url), counted towards the session's page limit and retried with
+    backoff (ratecontrol policy) when the load times out or fails."""
+    ratecontrol.policy().call(_get, driver, url, retry_on=(WebDriverException,), label=url)
+
+
+def pages_loaded(driver) -> int:
+    return _pages_loaded.get(driver, 0)
+
+
+def retire(driver) -> None:
+    """Mark a session for restart the next time it is released to its pool."""
+    _retired.add(driver)
+
+
+def is_retired(driver) -> bool:
+    return driver in _retired
+
+
+def memory_mb(driver):
+    """Resident memory of the chromedriver process and its browsers, or None without psutil."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except (psutil.Error, AttributeError):
+        return None
+
+
+_limits = {"max_pages": MAX_PAGES, "max_memory_mb": MAX_MEMORY_MB}
+
+
+def configure(max_pages: int = MAX_PAGES, max_memory_mb: float = MAX_MEMORY_MB) -> None:
+    """Restart limits of DriverPools created without their own (--max-pages, --max-browser-mb)."""
+    _limits.update(max_pages=max_pages, max_memory_mb=max_memory_mb)
+
+
+class DriverPool:
+    def __init__(self, size: int = 1, headless: bool = False, profile: LeanProfile = DEFAULT_PROFILE,
+                 max_pages: int = None, max_memory_mb: float = None):
+        self.size = size
+        self.headless = headless
+        self.profile = profile
+        self.max_pages = max_pages if max_pages is not None else _limits["max_pages"]
+        self.max_memory_mb = max_memory_mb if max_memory_mb is not None else _limits["max_memory_mb"]
+        self.restarts = 0
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._drivers = []
+        self._slots = 0  # sessions started or starting
+
+    def _reserve(self) -> bool:
+        with self._lock:
+            if self._slots >= self.size:
+                return False
+            self._slots += 1
+            return True
+
+    def _start(self):
+        try:
+            driver = create_driver(self.headless, self.profile)
+        except Exception:
+            with self._lock:
+                self._slots -= 1
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _discard(self, driver) -> None:
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+                self._slots -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def warm(self) -> None:
+        """Start every session up front, in parallel."""
+        missing = 0
+        while self._reserve():
+            missing += 1
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=missing) as pool:
+            for driver in pool.map(lambda _: self._start(), range(missing)):
+                self._idle.put(driver)
+
+    def drivers(self) -> list:
+        """The sessions currently started, idle or borrowed."""
+        with self._lock:
+            return list(self._drivers)
+
+    def _needs_restart(self, driver) -> bool:
+        if is_retired(driver):
+            log.info("Restarting retired browser")
+            return True
+        if pages_loaded(driver) >= self.max_pages:
+            log.info("Restarting browser after %d pages", pages_loaded(driver))
+            return True
+        used = memory_mb(driver)
+        if used is not None and used > self.max_memory_mb:
+            log.info("Restarting browser using %.0f MB", used)
+            return True
+        return False
+
+    def acquire(self):
+        """Borrow a warm driver, starting one if the pool is not full yet; pair with release()."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._reserve():
+                return self._start()
+            try:
+                # A release() that restarts its driver frees a slot instead of queueing one: check again
+                return self._idle.get(timeout=ACQUIRE_POLL)
+            except queue.Empty:
+                continue
+
+    def release(self, driver) -> None:
+        """Return a borrowed driver; it is restarted instead if it hit the page or memory limit."""
+        try:
+            # Drop any tabs left open (e.g. by a failed dataset)
+            for handle in driver.window_handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+            restart = self._needs_restart(driver)
+        except Exception:
+            restart = True  # the browser is gone or unresponsive
+        if restart:
+            self._discard(driver)
+            self.restarts += 1
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def session(self):
+        """Borrow a warm driver for one unit of work (a dataset, a reaction link)."""
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+            self._slots = 0
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def add_arguments(parser) -> None:
+    # The memory limit is the watchdog's --max-browser-mb (see watchdog.add_arguments)
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES, metavar="N",
+                        help="Restart a pooled browser after it has loaded N pages (default: %(default)s)")
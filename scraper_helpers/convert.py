@@ -0,0 +1,66 @@
+"""Convert existing scraper CSVs to Parquet.
+
+    python -m scraper_helpers.convert CRD_SCRAPER/scraped_smiles_data.csv
+    python -m scraper_helpers.convert scraped_data.csv -o ord.parquet
+
+The kind of file is detected from its header: ORD's scraped_data.csv is copied
+column for column, CRD's scraped_smiles_data.csv has its 'Data' blobs parsed
+back into reactants/reagents/product/modal columns. Rows are streamed, so the
+CSV is never loaded into memory at once.
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+from scraper_helpers import smiles
+from scraper_helpers.sinks import ORD_SCHEMA, SMILES_SCHEMA, ParquetRowSink
+
+ORD_COLUMNS = [name for name, _ in ORD_SCHEMA]
+
+
+def iter_records(csv_path: str):
+    """Yield (schema, record) for every row of an ORD or CRD output CSV."""
+    # The CRD 'Data' blobs are large multi-line fields
+    csv.field_size_limit(sys.maxsize)
+    with open(csv_path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header == ORD_COLUMNS:
+            for row in reader:
+                yield ORD_SCHEMA, dict(zip(ORD_COLUMNS, row))
+        elif header == smiles.LEGACY_CSV_COLUMNS:
+            for reaction_url, product_page, smiles_index, data in reader:
+                yield SMILES_SCHEMA, smiles.parse_smiles_record(reaction_url, product_page, smiles_index, data)
+        else:
+            raise ValueError(f"{csv_path}: unrecognised header {header}")
+
+
+def convert(csv_path: str, parquet_path: str = None) -> int:
+    """Write `csv_path` as Parquet and return the number of rows converted."""
+    parquet_path = parquet_path or os.path.splitext(csv_path)[0] + ".parquet"
+    sink = None
+    try:
+        for schema, record in iter_records(csv_path):
+            if sink is None:
+                sink = ParquetRowSink(parquet_path, schema, flush_seconds=float("inf"))
+            sink.write(record)
+    finally:
+        if sink is not None:
+            sink.close()
+    return sink.rows_written if sink is not None else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert scraped_data.csv / scraped_smiles_data.csv to Parquet")
+    parser.add_argument("csv_path", help="CSV written by ORD_SCRAPER.py or CRD.PY")
+    parser.add_argument("-o", "--output", help="Parquet file to write (default: next to the CSV)")
+    args = parser.parse_args()
+
+    rows = convert(args.csv_path, args.output)
+    print(f"Converted {rows} rows from {args.csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Browserless engine for the CRD (kmt.vander-lingen.nl) scraper.
+
+The archive, reaction data and /start/N product pages are plain server-rendered
+HTML, so they can be fetched with a pooled keep-alive HTTP session and parsed
+with lxml instead of driving Chrome. `crawl_reaction` walks the pages in the
+same order as the Selenium path in CRD.PY and yields the same rows.
+"""
+
+from urllib.parse import urljoin
+
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+
+from scraper_helpers import metrics, ratecontrol
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) CRD-scraper"
+REQUEST_TIMEOUT = 30
+
+
+def _has_class(*classes) -> str:
+    """XPath predicate matching elements that carry every class in `classes`."""
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes)
+
+
+RESULTS_BADGE_XPATH = f"//button[{_has_class('btn-info')}]//*[{_has_class('badge')}]"
+SMILES_BUTTON_XPATH = f"//button[{_has_class('btn', 'btn-outline-success', 'btn-sm')} and @data-reaction-smiles]"
+NEXT_LINK_XPATH = "//a[normalize-space()='Next']"
+NEXT_PRODUCT_XPATH = f"//a[{_has_class('btn', 'btn-primary')} and normalize-space()='Next']"
+
+
+def start_offset(url: str) -> int:
+    """The N of a /start/N page URL; 0 for the first page of a reaction data link."""
+    if url and "/start/" in url:
+        try:
+            return int(url.split("/start/")[-1].split("?")[0].strip("/"))
+        except ValueError:
+            pass
+    return 0
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Keep-alive session with a connection pool sized for `pool_size` concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class TransientHTTPError(requests.HTTPError):
+    """429 and 5xx responses, which are worth retrying."""
+
+
+RETRYABLE = (requests.ConnectionError, requests.Timeout, TransientHTTPError)
+
+
+def fetch(session: requests.Session, url: str, timeout: float = REQUEST_TIMEOUT, retry: bool = True) -> str:
+    """GET `url` and return the decoded body, raising on HTTP errors.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    backoff under the ratecontrol policy unless `retry` is False (the
+    frontier retries whole units itself).
+    """
+    if retry:
+        return ratecontrol.policy().call(fetch, session, url, timeout, False, retry_on=RETRYABLE, label=url)
+    with metrics.timed("navigate"):
+        response = session.get(url, timeout=timeout)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientHTTPError(f"{response.status_code} for {url}", response=response)
+        response.raise_for_status()
+        return response.text
+
+
+def parse_reaction_links(page_html: str, base_url: str) -> list:
+    """Absolute hrefs of every 'reaction data' link on the archive page."""
+    tree = lxml_html.fromstring(page_html)
+    hrefs = tree.xpath("//a[normalize-space()='reaction data']/@href")
+    return [urljoin(base_url, href) for href in hrefs if href]
+
+
+def parse_product_page(page_html: str, base_url: str) -> dict:
+    """Extract the Results badge count, SMILES attributes and pagination links from one page."""
+    tree = lxml_html.fromstring(page_html)
+
+    total_results = None
+    badges = tree.xpath(RESULTS_BADGE_XPATH)
+    if badges:
+        try:
+            total_results = int(badges[0].text_content().strip())
+        except ValueError:
+            total_results = None
+
+    smiles_list = [s for s in tree.xpath(f"{SMILES_BUTTON_XPATH}/@data-reaction-smiles") if s]
+
+    next_links = tree.xpath(f"{NEXT_LINK_XPATH}/@href")
+    next_url = urljoin(base_url, next_links[0]) if next_links else None
+
+    next_product_url = None
+    for href in tree.xpath(f"{NEXT_PRODUCT_XPATH}/@href"):
+        if "/start/" in href:
+            try:
+                start_num = int(href.split("/start/")[-1])
+            except ValueError:
+                continue
+            if start_num > 0:
+                next_product_url = urljoin(base_url, href)
+                break
+
+    return {
+        "total_results": total_results,
+        "smiles": smiles_list,
+        "next_url": next_url,
+        "next_product_url": next_product_url,
+    }
+
+
+def crawl_step(page: dict, product_page: int, smiles_index: int, total_results):
+    """Process one parsed page of a reaction data link.
+
+    `total_results` is None when `page` starts a new product page, in which case
+    its Results badge is read. Returns (rows, follow_up) where rows are
+    (product_page, smiles_index, smiles_data) tuples and follow_up is the
+    (url, product_page, smiles_index, total_results) state of the next page to
+    fetch, or None when this reaction data link is finished.
+    """
+    rows = []
+    if total_results is None:
+        total_results = page["total_results"]
+        if not total_results:
+            return rows, None
+        smiles_index = 0
+
+    if page["smiles"]:
+        for smiles_data in page["smiles"]:
+            rows.append((product_page, smiles_index, smiles_data))
+            smiles_index += 1
+        # More SMILES for this product behind the 'Next' link
+        if smiles_index < total_results and page["next_url"]:
+            return rows, (page["next_url"], product_page, smiles_index, total_results)
+
+    if page["next_product_url"]:
+        return rows, (page["next_product_url"], product_page + 1, 0, None)
+    return rows, None
+
+
+def iter_pages(session: requests.Session, link: str):
+    """Yield (page_url, rows) for every page fetched while crawling one reaction data link.
+
+    Mirrors the Selenium loop: SMILES are collected page by page via the 'Next'
+    link until the Results badge count is reached, then the next /start/N
+    product page is followed, restarting the SMILES count.
+    """
+    state = (link, 1, 0, None)
+    while state:
+        url, product_page, smiles_index, total_results = state
+        page_html = fetch(session, url)
+        with metrics.timed("extract"):
+            page = parse_product_page(page_html, url)
+        rows, state = crawl_step(page, product_page, smiles_index, total_results)
+        yield url, rows
+
+
+def crawl_reaction(session: requests.Session, link: str):
+    """Yield (product_page, smiles_index, smiles_data) for one reaction data link."""
+    for _, rows in iter_pages(session, link):
+        yield from rows
@@ -0,0 +1,188 @@
+"""SQLite store of scraped CRD reactions for incremental refreshes.
+
+SMILES rows are keyed by (DOI, /start/ page offset, SMILES index) and carry a
+content hash. Every product page a crawl finishes is recorded with its Results
+badge count and the URL of the next product page, so a refresh can compare
+the badge on a product's first page with the stored count and jump straight
+to the next product when nothing changed. Reaction data links new to the
+archive are crawled in full.
+
+    links     (doi, url, position, listed, first_seen, checked_at)
+    products  (doi, product_page, start_offset, total_results, next_product_url, content_hash, crawled_at)
+    smiles    (doi, page_offset, smiles_index, product_page, smiles_data, content_hash)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+from scraper_helpers import crd_http, smiles
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    doi TEXT PRIMARY KEY, url TEXT NOT NULL, position INTEGER, listed INTEGER NOT NULL DEFAULT 1,
+    first_seen REAL NOT NULL, checked_at REAL);
+CREATE TABLE IF NOT EXISTS products (
+    doi TEXT NOT NULL, product_page INTEGER NOT NULL, start_offset INTEGER NOT NULL,
+    total_results INTEGER NOT NULL, next_product_url TEXT, content_hash TEXT NOT NULL, crawled_at REAL NOT NULL,
+    PRIMARY KEY (doi, product_page));
+CREATE TABLE IF NOT EXISTS smiles (
+    doi TEXT NOT NULL, page_offset INTEGER NOT NULL, smiles_index INTEGER NOT NULL,
+    product_page INTEGER NOT NULL, smiles_data TEXT NOT NULL, content_hash TEXT NOT NULL,
+    PRIMARY KEY (doi, page_offset, smiles_index));
+CREATE INDEX IF NOT EXISTS smiles_by_product ON smiles (doi, product_page);
+CREATE INDEX IF NOT EXISTS smiles_by_hash ON smiles (content_hash);
+"""
+
+
+def doi_from_url(url: str) -> str:
+    """DOI part of a reaction data URL (.../doi/<doi>/start/N); the path itself for other URLs."""
+    path = url.split("?")[0].split("/start/")[0].rstrip("/")
+    return path.split("/doi/", 1)[1] if "/doi/" in path else path
+
+
+def content_hash(*values) -> str:
+    return hashlib.sha1("\x1f".join(str(v) for v in values).encode("utf-8")).hexdigest()
+
+
+class ReactionStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.stats = {"skipped_products": 0, "crawled_products": 0, "changed_products": 0}
+        self._lock = threading.Lock()
+        # (doi, product_page) -> (start offset, badge count, stored hash, row hashes so far) of products being crawled
+        self._product_rows = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def sync_links(self, urls: list) -> list:
+        """Record the archive's reaction data links in listing order; returns the ones not seen before."""
+        now = time.time()
+        with self._lock:
+            known = {doi for (doi,) in self._conn.execute("SELECT doi FROM links")}
+            self._conn.execute("UPDATE links SET listed = 0")
+            new = []
+            for position, url in enumerate(urls):
+                doi = doi_from_url(url)
+                if doi not in known:
+                    new.append(url)
+                self._conn.execute(
+                    "INSERT INTO links (doi, url, position, listed, first_seen) VALUES (?, ?, ?, 1, ?)"
+                    " ON CONFLICT (doi) DO UPDATE SET url = excluded.url, position = excluded.position, listed = 1",
+                    (doi, url, position, now),
+                )
+            self._conn.commit()
+        return new
+
+    def links_due(self, urls: list, max_age: float = 0.0) -> list:
+        """Links never finished, or last checked more than `max_age` seconds ago."""
+        if max_age <= 0:
+            return list(urls)
+        cutoff = time.time() - max_age
+        with self._lock:
+            checked = dict(self._conn.execute("SELECT doi, checked_at FROM links WHERE checked_at IS NOT NULL"))
+        return [url for url in urls if checked.get(doi_from_url(url), 0) < cutoff]
+
+    def crawl_step(self, link: str, url: str, page: dict, product_page: int, smiles_index: int, total_results):
+        """crd_http.crawl_step that records what it crawls and skips unchanged product pages.
+
+        On the first page of a product (total_results is None) the Results badge
+        is compared with the stored product; when it matches, the product's
+        remaining pages are skipped and the follow-up jumps to the stored next
+        product URL. Returns the follow-up state like crd_http.crawl_step.
+        """
+        doi = doi_from_url(link)
+        page_offset = crd_http.start_offset(url)
+        if total_results is None:
+            stored = self._stored_product(doi, product_page)
+            badge = page["total_results"] or 0
+            if stored and stored[0] == page_offset and stored[1] == badge:
+                self.stats["skipped_products"] += 1
+                if stored[2]:
+                    return (stored[2], product_page + 1, 0, None)
+                self._finish_link(doi, product_page)
+                return None
+            # Re-crawl: drop the stored product until its last page is saved again
+            self._product_rows[(doi, product_page)] = (page_offset, badge, stored[3] if stored else None, [])
+            with self._lock:
+                self._conn.execute("DELETE FROM products WHERE doi = ? AND product_page = ?", (doi, product_page))
+                self._conn.execute("DELETE FROM smiles WHERE doi = ? AND product_page = ?", (doi, product_page))
+                self._conn.commit()
+
+        rows, follow_up = crd_http.crawl_step(page, product_page, smiles_index, total_results)
+        start, badge, old_hash, hashes = self._product_rows[(doi, product_page)]
+        records = [(doi, page_offset, index, product_page, data, content_hash(data)) for _, index, data in rows]
+        hashes.extend(record[5] for record in records)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO smiles (doi, page_offset, smiles_index, product_page, smiles_data,"
+                " content_hash) VALUES (?, ?, ?, ?, ?, ?)", records)
+            self._conn.commit()
+
+        # The product ends when the follow-up starts another product (or there is none)
+        if follow_up is None or follow_up[3] is None:
+            next_product_url = follow_up[0] if follow_up else None
+            product_hash = content_hash(*hashes)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO products (doi, product_page, start_offset, total_results, next_product_url,"
+                    " content_hash, crawled_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doi, product_page, start, badge, next_product_url, product_hash, time.time()),
+                )
+                self._conn.commit()
+            del self._product_rows[(doi, product_page)]
+            self.stats["crawled_products"] += 1
+            if product_hash != old_hash:
+                self.stats["changed_products"] += 1
+            if follow_up is None:
+                self._finish_link(doi, product_page)
+        return follow_up
+
+    def _stored_product(self, doi: str, product_page: int):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT start_offset, total_results, next_product_url, content_hash FROM products"
+                " WHERE doi = ? AND product_page = ?", (doi, product_page),
+            ).fetchone()
+
+    def _finish_link(self, doi: str, last_product_page: int) -> None:
+        """Mark the link checked and drop product pages beyond its last one."""
+        with self._lock:
+            self._conn.execute("DELETE FROM products WHERE doi = ? AND product_page > ?", (doi, last_product_page))
+            self._conn.execute("DELETE FROM smiles WHERE doi = ? AND product_page > ?", (doi, last_product_page))
+            self._conn.execute("UPDATE links SET checked_at = ? WHERE doi = ?", (time.time(), doi))
+            self._conn.commit()
+
+    def records(self, batch_size: int = 1000):
+        """Structured SMILES records (see sinks.SMILES_SCHEMA) of the listed links, in archive order.
+
+        Rows are fetched `batch_size` at a time, so the store is never loaded into memory at once.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT l.url, s.product_page, s.smiles_index, s.smiles_data FROM smiles s"
+                " JOIN links l ON l.doi = s.doi WHERE l.listed = 1"
+                " ORDER BY l.position, s.product_page, s.page_offset, s.smiles_index"
+            )
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for url, product_page, smiles_index, smiles_data in rows:
+                yield smiles.smiles_record(url, product_page, smiles_index, smiles_data)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM smiles").fetchone()[0]
+
+    def unique_count(self) -> int:
+        """Distinct reaction SMILES across all DOIs."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT content_hash) FROM smiles").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,131 @@
+"""Asyncio URL frontier with per-host concurrency caps and politeness delays.
+
+Handlers are coroutines `handler(url, payload, frontier)`; they may call
+`frontier.add()` for URLs they discover (pagination, detail pages), which are
+deduplicated on the fly and scheduled while other requests are still in flight.
+
+With a `ratecontrol.AimdController` the per-host limit and delay adapt to
+measured latency instead of staying at `per_host` / `delay`; with a
+`ratecontrol.RetryPolicy` a failed handler is re-queued after a jittered
+backoff until its attempts or the retry budget run out.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from scraper_helpers import metrics, ratecontrol
+
+log = logging.getLogger(__name__)
+
+
+class CrawlFrontier:
+    def __init__(self, handler, concurrency: int = 8, per_host: int = 4, delay: float = 0.0,
+                 controller: ratecontrol.AimdController = None, retry: ratecontrol.RetryPolicy = None):
+        self.handler = handler
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.controller = controller
+        self.retry = retry
+        self.seen = set()
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self._attempts = {}
+        self._retry_tasks = set()
+        self._queue = None
+        self._pending = []
+        self._host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        self._host_locks = defaultdict(asyncio.Lock)
+        self._host_last_start = defaultdict(float)
+
+    def add(self, url: str, payload=None) -> bool:
+        """Queue `url` unless it was already seen; returns True if it was queued."""
+        if not url or url in self.seen:
+            return False
+        self.seen.add(url)
+        if self._queue is None:
+            self._pending.append((url, payload))
+        else:
+            self._queue.put_nowait((url, payload))
+        return True
+
+    async def _polite_start(self, host: str) -> None:
+        """Space out request starts to the same host by at least `delay` seconds."""
+        if self.delay <= 0:
+            return
+        async with self._host_locks[host]:
+            wait = self._host_last_start[host] + self.delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                metrics.observe("sleep", wait)
+            self._host_last_start[host] = time.monotonic()
+
+    async def _handle(self, url: str, payload, host: str) -> None:
+        if self.controller is None:
+            async with self._host_slots[host]:
+                await self._polite_start(host)
+                await self.handler(url, payload, self)
+            return
+        await self.controller.acquire(host)
+        start = time.monotonic()
+        ok = False
+        try:
+            await self.handler(url, payload, self)
+            ok = True
+        finally:
+            await self.controller.release(host, time.monotonic() - start, ok)
+
+    async def _requeue(self, url: str, payload, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._queue.put_nowait((url, payload))
+        # The failed attempt stays unfinished until its retry is queued, so run() keeps waiting
+        self._queue.task_done()
+
+    async def _worker(self) -> None:
+        while True:
+            url, payload = await self._queue.get()
+            host = urlsplit(url).netloc
+            attempt = self._attempts.get(url, 0) + 1
+            self._attempts[url] = attempt
+            if self.retry is not None and attempt == 1:
+                self.retry.started()
+            requeued = False
+            try:
+                await self._handle(url, payload, host)
+                self.completed += 1
+            except Exception as e:
+                if self.retry is not None and self.retry.should_retry(attempt):
+                    delay = self.retry.backoff(attempt)
+                    log.info("Retrying %s in %.1f s (attempt %s/%s): %s", url, delay, attempt + 1,
+                             self.retry.attempts, e)
+                    self.retried += 1
+                    task = asyncio.create_task(self._requeue(url, payload, delay))
+                    self._retry_tasks.add(task)
+                    task.add_done_callback(self._retry_tasks.discard)
+                    requeued = True
+                else:
+                    self.failed += 1
+                    log.warning("Error crawling %s: %s", url, e)
+            finally:
+                if not requeued:
+                    self._queue.task_done()
+
+    async def run(self) -> None:
+        """Crawl until the queue is drained and no handler is still running."""
+        self._queue = asyncio.Queue()
+        for item in self._pending:
+            self._queue.put_nowait(item)
+        self._pending.clear()
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await self._queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._queue = None
@@ -0,0 +1,270 @@
+"""SQLite job queue for the scrapers' --serve mode.
+
+    python -m scraper_helpers.jobqueue submit ord ord_dataset-0b6c1f2e...
+    python -m scraper_helpers.jobqueue submit crd 10.1021/acs.orglett.0c01234
+    python -m scraper_helpers.jobqueue status --jobs
+
+A job is a (kind, target) pair: an ORD dataset ID or URL, or a CRD DOI or
+reaction data URL. A serving scraper keeps its browsers warm, claims the
+oldest queued job of its kind, saves its rows and records it as done (with
+the number of rows) or failed (with the error). Submitting a target that is
+already queued or running adds nothing. Jobs left running by a service that
+died are queued again when the next service starts (so run one service per
+kind and queue file), and resume from the crawl journal.
+
+    jobs (id, kind, target, status, attempts, submitted_at, started_at, finished_at, rows, error)
+"""
+
+import argparse
+import logging
+import signal
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = "scrape_jobs.sqlite"
+KINDS = ("ord", "crd")
+STATUSES = ("queued", "running", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, target TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,
+    submitted_at REAL NOT NULL, started_at REAL, finished_at REAL, rows INTEGER, error TEXT);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (kind, status, id);
+"""
+
+Job = namedtuple("Job", "id kind target attempts")
+
+
+class JobQueue:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Submitters and services may share the file: wait for each other's write locks
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def submit(self, kind: str, targets) -> list:
+        """Queue a job per target; returns the job ids (the existing id for a target already queued or running)."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of {KINDS}")
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for target in targets:
+                    row = self._conn.execute(
+                        "SELECT id FROM jobs WHERE kind = ? AND target = ? AND status IN ('queued', 'running')",
+                        (kind, target)).fetchone()
+                    if row is None:
+                        row = (self._conn.execute(
+                            "INSERT INTO jobs (kind, target, submitted_at) VALUES (?, ?, ?)",
+                            (kind, target, time.time())).lastrowid,)
+                    ids.append(row[0])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def claim(self, kind: str):
+        """Mark the oldest queued job of `kind` running and return it as a Job; None when there is none."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, kind, target, attempts FROM jobs WHERE kind = ? AND status = 'queued'"
+                    " ORDER BY id LIMIT 1", (kind,)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ? WHERE id = ?",
+                        (time.time(), row[0]))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(row[0], row[1], row[2], row[3] + 1) if row is not None else None
+
+    def finish(self, job_id: int, rows: int) -> None:
+        self._set_status(job_id, "done", rows=rows)
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._set_status(job_id, "failed", error=error)
+
+    def _set_status(self, job_id: int, status: str, rows: int = None, error: str = None) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ?, finished_at = ?, rows = ?, error = ? WHERE id = ?",
+                               (status, time.time(), rows, error, job_id))
+
+    def requeue_running(self, kind: str) -> int:
+        """Queue the jobs of `kind` still marked running by a service that stopped; returns how many."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'queued' WHERE kind = ? AND status = 'running'", (kind,)).rowcount
+
+    def counts(self, kind: str = None) -> dict:
+        """status -> number of jobs (of `kind`, or all kinds)."""
+        query = "SELECT status, COUNT(*) FROM jobs" + (" WHERE kind = ?" if kind else "") + " GROUP BY status"
+        with self._lock:
+            found = dict(self._conn.execute(query, (kind,) if kind else ()))
+        return {status: found.get(status, 0) for status in STATUSES}
+
+    def jobs(self, kind: str = None, status: str = None, limit: int = 50) -> list:
+        """Most recent jobs as dicts, newest first."""
+        clauses, params = [], []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT * FROM jobs{where} ORDER BY id DESC LIMIT ?", params + [limit])
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CountingSink:
+    """Sink wrapper counting the rows one job writes through the shared sink."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.rows = 0
+
+    def __getattr__(self, name):
+        return getattr(self.sink, name)
+
+    def write_rows(self, rows, on_flushed=None) -> None:
+        rows = list(rows)
+        self.rows += len(rows)
+        self.sink.write_rows(rows, on_flushed)
+
+    def write(self, row, on_flushed=None) -> None:
+        self.write_rows([row], on_flushed)
+
+
+def serve(queue: JobQueue, kind: str, handle, workers: int = 1, poll: float = 2.0, idle_exit: float = None) -> dict:
+    """Process jobs of `kind` with `workers` threads until stopped; returns the final job counts.
+
+    `handle(job)` processes one job and returns the number of rows it saved;
+    an exception fails the job. With `idle_exit`, the service stops once no
+    job has been queued or running for that many seconds (0: as soon as the
+    queue is empty); otherwise it idles, polling every `poll` seconds, until
+    SIGTERM or Ctrl+C. Jobs in progress are finished before it returns.
+    """
+    requeued = queue.requeue_running(kind)
+    if requeued:
+        log.info("Queued %s %s job(s) again that were running when the last service stopped", requeued, kind)
+    stop = threading.Event()
+    state_lock = threading.Lock()
+    state = {"busy": 0, "last_active": time.monotonic()}
+
+    def idle_expired() -> bool:
+        with state_lock:
+            return idle_exit is not None and not state["busy"] and \
+                time.monotonic() - state["last_active"] >= idle_exit
+
+    def worker(worker_id: int) -> None:
+        while not stop.is_set():
+            with state_lock:
+                job = queue.claim(kind)
+                if job is not None:
+                    state["busy"] += 1
+            if job is None:
+                if idle_expired():
+                    stop.set()
+                else:
+                    stop.wait(poll)
+                continue
+            log.info("[Worker %s] Job %s: %s %s (attempt %s)", worker_id, job.id, kind, job.target, job.attempts)
+            start = time.perf_counter()
+            try:
+                rows = handle(job)
+            except Exception as e:
+                queue.fail(job.id, str(e))
+                log.warning("[Worker %s] Job %s failed: %s", worker_id, job.id, e)
+            else:
+                queue.finish(job.id, rows)
+                log.info("[Worker %s] Job %s done: %s row(s) in %.1f s", worker_id, job.id, rows,
+                         time.perf_counter() - start)
+            finally:
+                with state_lock:
+                    state["busy"] -= 1
+                    state["last_active"] = time.monotonic()
+
+    previous = None
+    if threading.current_thread() is threading.main_thread():
+        previous = signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    threads = [threading.Thread(target=worker, args=(i,), name=f"{kind}-worker-{i}", daemon=True)
+               for i in range(1, max(workers, 1) + 1)]
+    log.info("Serving %s jobs from %s with %s worker(s)%s", kind, queue.path, len(threads),
+             "" if idle_exit is None else f", exiting after {idle_exit:g} s idle")
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            try:
+                for thread in threads:
+                    thread.join(0.5)
+            except KeyboardInterrupt:
+                log.info("Stopping: finishing the job(s) in progress...")
+                stop.set()
+    finally:
+        if previous is not None:
+            signal.signal(signal.SIGTERM, previous)
+    counts = queue.counts(kind)
+    log.info("Stopped serving %s jobs: %s", kind, ", ".join(f"{n} {status}" for status, n in counts.items()))
+    return counts
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--serve", nargs="?", const=DEFAULT_PATH, metavar="QUEUE",
+                        help="Run as a service processing jobs from an SQLite job queue "
+                             f"(default file: {DEFAULT_PATH}; submit with python -m scraper_helpers.jobqueue)")
+    parser.add_argument("--idle-exit", type=float, metavar="SECONDS",
+                        help="--serve: stop after this many seconds without jobs (0: once the queue is empty; "
+                             "default: keep idling until SIGTERM or Ctrl+C)")
+    parser.add_argument("--poll", type=float, default=2.0, metavar="SECONDS",
+                        help="--serve: seconds between queue checks while idle (default: 2)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Submit scraping jobs and report their status")
+    parser.add_argument("--queue", default=DEFAULT_PATH, help=f"Job queue file (default: {DEFAULT_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="Queue ORD dataset IDs/URLs or CRD DOIs/reaction data URLs")
+    submit.add_argument("kind", choices=KINDS)
+    submit.add_argument("targets", nargs="+")
+    status = commands.add_parser("status", help="Job counts per status, and optionally the latest jobs")
+    status.add_argument("--kind", choices=KINDS)
+    status.add_argument("--jobs", type=int, nargs="?", const=20, default=0, metavar="N",
+                        help="Also list the N most recent jobs (default: 20)")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue)
+    try:
+        if args.command == "submit":
+            ids = queue.submit(args.kind, args.targets)
+            print(f"Queued {len(ids)} {args.kind} job(s): {', '.join(map(str, ids))}")
+            return
+        counts = queue.counts(args.kind)
+        print(", ".join(f"{n} {status}" for status, n in counts.items()))
+        for job in queue.jobs(args.kind, limit=args.jobs) if args.jobs else ():
+            detail = job["error"] if job["status"] == "failed" else (
+                f"{job['rows']} rows" if job["status"] == "done" else "")
+            print(f"{job['id']:>6}  {job['kind']}  {job['status']:<8} {job['target']}  {detail}")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
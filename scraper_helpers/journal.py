@@ -0,0 +1,58 @@
+"""SQLite crawl journal used by --resume.
+
+Completed units are recorded as (scope, unit) pairs, e.g. (dataset_id, detail
+button number) for ORD or (reaction URL, /start/ offset) for CRD. A resumed
+run skips units that are already in the journal and appends only new rows.
+"""
+
+import sqlite3
+import threading
+import time
+
+LINK_DONE = "*"  # unit marking a whole scope (dataset / reaction link) as finished
+
+
+class CrawlJournal:
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        # Shared by the worker threads; every access goes through the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completed ("
+            " scope TEXT NOT NULL, unit TEXT NOT NULL, completed_at REAL NOT NULL,"
+            " PRIMARY KEY (scope, unit))"
+        )
+        if not resume:
+            # A fresh run starts a fresh journal, just like it truncates the CSV
+            self._conn.execute("DELETE FROM completed")
+        self._conn.commit()
+
+    def is_done(self, scope: str, unit) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM completed WHERE scope = ? AND unit = ?", (scope, str(unit))
+            ).fetchone()
+        return row is not None
+
+    def mark_done(self, scope: str, unit) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completed (scope, unit, completed_at) VALUES (?, ?, ?)",
+                (scope, str(unit), time.time()),
+            )
+            self._conn.commit()
+
+    def forget(self, scope: str) -> None:
+        """Drop a scope's completed units so it is crawled again (e.g. a dataset submitted as a new job)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM completed WHERE scope = ?", (scope,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completed").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,189 @@
+"""Per-stage timing for the scrapers' hot paths.
+
+Code wraps its stages in `with metrics.timed("navigate"):` (or calls
+`observe()` with a measured duration), counts things with `count()` and
+records levels such as peak memory with `gauge()`. At the
+end of a run `report(prefix)` writes `<prefix>.metrics.json` and a
+Prometheus text file `<prefix>.metrics.prom`, and logs p50/p95 per stage
+and rows per second, so it is clear whether time goes to page loads, waits,
+sleeps or parsing.
+
+Stages used by the scrapers:
+
+    navigate     page loads (browser.load, crd_http.fetch)
+    wait         event waits (waits.wait_until), including those inside other stages
+    modal_open   clicking a modal open until its content is shown
+    modal_close  closing a modal until it is gone
+    extract      reading and parsing values out of a page or modal
+    write        writing a batch of rows to the output file
+    sleep        politeness delays and retry backoff
+    unit         one journal unit end to end (an ORD reaction, a CRD page)
+
+Stages nest, so their totals overlap rather than add up to the run time.
+Counts, totals and maxima are exact; p50/p95 come from a fixed-size sample
+of each stage's durations, so memory stays flat however long a run lasts.
+"""
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+# Percentiles come from a uniform sample of at most this many durations per stage
+# (exact until a stage has more), so long --serve runs keep a fixed footprint
+RESERVOIR_SIZE = 4096
+
+_lock = threading.Lock()
+_random = random.Random()
+_counters = defaultdict(int)
+_gauges = {}
+_started = time.perf_counter()
+
+
+class _Stage:
+    """Exact count, total and max of a stage's samples, plus a reservoir sample for its percentiles."""
+
+    __slots__ = ("count", "total", "max", "reservoir")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.reservoir = []
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.reservoir) < RESERVOIR_SIZE:
+            self.reservoir.append(seconds)
+        else:
+            # Algorithm R: every sample so far stays in the reservoir with equal probability
+            slot = _random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self.reservoir[slot] = seconds
+
+
+_stages = defaultdict(_Stage)
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record one `seconds` long sample for `stage`."""
+    with _lock:
+        _stages[stage].add(seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the body of the with-block as one sample of `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add `amount` to the counter `name` (e.g. "rows")."""
+    with _lock:
+        _counters[name] += amount
+
+
+def gauge(name: str, value: float) -> None:
+    """Set the gauge `name` (e.g. "memory_peak_mb") to `value`."""
+    with _lock:
+        _gauges[name] = value
+
+
+def reset() -> None:
+    global _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _gauges.clear()
+        _started = time.perf_counter()
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summary() -> dict:
+    """Run time, counters, rows per second and count/total/p50/p95/max per stage."""
+    with _lock:
+        samples = {stage: (s.count, s.total, s.max, sorted(s.reservoir)) for stage, s in _stages.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        elapsed = time.perf_counter() - _started
+    stages = {
+        stage: {
+            "count": n,
+            "total_seconds": total,
+            "p50_seconds": _percentile(values, 0.50),
+            "p95_seconds": _percentile(values, 0.95),
+            "max_seconds": longest,
+        }
+        for stage, (n, total, longest, values) in samples.items() if n
+    }
+    return {
+        "elapsed_seconds": elapsed,
+        "rows": counters.get("rows", 0),
+        "rows_per_second": counters.get("rows", 0) / elapsed if elapsed > 0 else 0.0,
+        "counters": counters,
+        "gauges": gauges,
+        "stages": stages,
+    }
+
+
+def prometheus_text(data: dict) -> str:
+    """`summary()` in the Prometheus text exposition format."""
+    lines = [
+        "# HELP scraper_stage_seconds Time spent per crawl stage.",
+        "# TYPE scraper_stage_seconds summary",
+    ]
+    for stage, stats in sorted(data["stages"].items()):
+        lines.append(f'scraper_stage_seconds{{stage="{stage}",quantile="0.5"}} {stats["p50_seconds"]:.6f}')
+        lines.append(f'scraper_stage_seconds{{stage="{stage}",quantile="0.95"}} {stats["p95_seconds"]:.6f}')
+        lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]:.6f}')
+        lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f"# TYPE scraper_{name}_total counter")
+        lines.append(f"scraper_{name}_total {value}")
+    for name, value in sorted(data.get("gauges", {}).items()):
+        lines.append(f"# TYPE scraper_{name} gauge")
+        lines.append(f"scraper_{name} {value}")
+    lines.append("# TYPE scraper_rows_per_second gauge")
+    lines.append(f"scraper_rows_per_second {data['rows_per_second']:.6f}")
+    lines.append("# TYPE scraper_elapsed_seconds gauge")
+    lines.append(f"scraper_elapsed_seconds {data['elapsed_seconds']:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def log_summary(data: dict) -> None:
+    lines = [f"{'stage':<12} {'count':>8} {'total s':>10} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+    for stage, stats in sorted(data["stages"].items(), key=lambda item: -item[1]["total_seconds"]):
+        lines.append(f"{stage:<12} {stats['count']:>8} {stats['total_seconds']:>10.1f}"
+                     f" {stats['p50_seconds'] * 1000:>9.1f} {stats['p95_seconds'] * 1000:>9.1f}"
+                     f" {stats['max_seconds'] * 1000:>9.1f}")
+    log.info("Stage timings:\n%s", "\n".join(lines))
+    log.info("%s rows in %.1f s (%.1f rows/s)", data["rows"], data["elapsed_seconds"], data["rows_per_second"])
+
+
+def report(prefix: str) -> dict:
+    """Write `<prefix>.metrics.json` and `<prefix>.metrics.prom` and log the summary."""
+    data = summary()
+    with open(f"{prefix}.metrics.json", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    with open(f"{prefix}.metrics.prom", "w", encoding="utf-8") as f:
+        f.write(prometheus_text(data))
+    log_summary(data)
+    log.info("Metrics written to %s.metrics.json and %s.metrics.prom", prefix, prefix)
+    return data
@@ -0,0 +1,180 @@
+"""Streaming normalisation of scraped reaction SMILES into one row per component.
+
+    python -m scraper_helpers.normalize CRD_SCRAPER/scraped_smiles_data.csv
+    python -m scraper_helpers.normalize scraped_smiles_data.sqlite -o components.parquet
+
+Every stage is a generator: records are read one at a time from the CRD CSV
+(or the --refresh store), split into reactants > reagents > product, exploded
+on '.' into components and canonicalised, then written through a buffered
+sink. Memory stays constant however large the input is. Canonical SMILES come
+from RDKit when it is installed (otherwise the SMILES are only trimmed) and
+are cached, since the same solvents and reagents recur across reactions.
+
+CRD.PY --components FILE feeds the same stages from the live crawl.
+"""
+
+import argparse
+import os
+import threading
+from functools import lru_cache
+from itertools import islice
+
+from scraper_helpers.convert import iter_records
+from scraper_helpers.sinks import COMPONENT_SCHEMA, SMILES_SCHEMA, CsvRowSink, ParquetRowSink
+
+try:
+    from rdkit import Chem, RDLogger
+    RDLogger.DisableLog("rdApp.*")
+except ImportError:  # canonicalisation falls back to trimming
+    Chem = None
+
+COMPONENT_COLUMNS = [name for name, _ in COMPONENT_SCHEMA]
+ROLES = (("reactants", "reactant"), ("reagents", "reagent"), ("product", "product"))
+# Component rows buffered longer than this are flushed (or reported stale to the watchdog)
+FLUSH_SECONDS = 30.0
+
+
+@lru_cache(maxsize=65536)
+def canonical_smiles(value: str) -> str:
+    """RDKit canonical SMILES of one component; '' when RDKit cannot parse it."""
+    value = value.strip()
+    if Chem is None or not value:
+        return value
+    mol = Chem.MolFromSmiles(value)
+    return Chem.MolToSmiles(mol) if mol is not None else ""
+
+
+def read_records(path: str):
+    """Structured SMILES records from a CRD output CSV or a --refresh SQLite store."""
+    if path.endswith((".sqlite", ".db")):
+        from scraper_helpers.crd_store import ReactionStore
+        store = ReactionStore(path)
+        try:
+            yield from store.records()
+        finally:
+            store.close()
+        return
+    for schema, record in iter_records(path):
+        if schema is not SMILES_SCHEMA:
+            raise ValueError(f"{path}: not a CRD scraped_smiles_data.csv")
+        yield record
+
+
+def explode(records, canonical: bool = True):
+    """Yield one component row (see sinks.COMPONENT_SCHEMA) per '.'-separated
+    component of each record's reactants, reagents and product."""
+    for record in records:
+        for field, role in ROLES:
+            for component_index, component in enumerate(c for c in (record.get(field) or "").split(".") if c):
+                yield {
+                    "reaction_url": record["reaction_url"],
+                    "product_page": record["product_page"],
+                    "smiles_index": record["smiles_index"],
+                    "role": role,
+                    "component_index": component_index,
+                    "smiles": component.strip(),
+                    "canonical_smiles": canonical_smiles(component) if canonical else component.strip(),
+                }
+
+
+def create_sink(path: str, resume: bool = False):
+    """Component output: Parquet for *.parquet (requires pyarrow), CSV otherwise.
+
+    With `resume` an existing output is appended to, as for the main sink.
+    """
+    if path.endswith(".parquet"):
+        return ParquetRowSink(path, COMPONENT_SCHEMA, resume=resume, flush_seconds=FLUSH_SECONDS)
+    return CsvRowSink(path, COMPONENT_COLUMNS, resume=resume, flush_rows=5000, flush_seconds=FLUSH_SECONDS)
+
+
+def normalize(input_path: str, output_path: str = None, canonical: bool = True) -> int:
+    """Stream `input_path` into component rows at `output_path`; returns the number of rows written."""
+    output_path = output_path or os.path.splitext(input_path)[0] + ".components.csv"
+    sink = create_sink(output_path)
+    try:
+        for row in explode(read_records(input_path), canonical):
+            sink.write(row)
+    finally:
+        sink.close()
+    return sink.rows_written
+
+
+class _Countdown:
+    """Callable that runs `callback` on its `calls`-th call (the sinks flush on different threads)."""
+
+    def __init__(self, calls: int, callback):
+        self._remaining = calls
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def __call__(self) -> None:
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining:
+                return
+        self._callback()
+
+
+class ComponentTee:
+    """Sink wrapper that also writes the component rows of every record to `components`.
+
+    Records are passed on `flush_rows` at a time, so a generator (e.g. a
+    --refresh store) is never held in memory whole. Journal callbacks
+    (`on_flushed`) fire once both sinks have written the rows, so a resumed
+    run never skips a unit whose components were still buffered; flush(),
+    pending() and stale() cover both sinks.
+    """
+
+    def __init__(self, sink, components, canonical: bool = True):
+        self.sink = sink
+        self.components = components
+        self.canonical = canonical
+
+    def __getattr__(self, name):
+        return getattr(self.sink, name)
+
+    def write_rows(self, rows, on_flushed=None) -> None:
+        rows = iter(rows)
+        for batch in iter(lambda: list(islice(rows, self.sink.flush_rows)), []):
+            self.sink.write_rows(batch)
+            self.components.write_rows(explode(batch, self.canonical))
+        if on_flushed is not None:
+            # Called with whichever of the two sinks flushes the last batch last
+            both = _Countdown(2, on_flushed)
+            self.sink.write_rows([], both)
+            self.components.write_rows([], both)
+
+    def write(self, row, on_flushed=None) -> None:
+        self.write_rows([row], on_flushed)
+
+    def flush(self) -> None:
+        self.sink.flush()
+        self.components.flush()
+
+    def pending(self) -> int:
+        return self.sink.pending() + self.components.pending()
+
+    def stale(self) -> bool:
+        return self.sink.stale() or self.components.stale()
+
+    def close(self) -> None:
+        self.sink.close()
+        self.components.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Split and canonicalise scraped reaction SMILES, one row per component")
+    parser.add_argument("input", help="scraped_smiles_data.csv or a CRD.PY --refresh store (.sqlite)")
+    parser.add_argument("-o", "--output", help="CSV or .parquet file to write (default: <input>.components.csv)")
+    parser.add_argument("--no-canonical", action="store_true", help="Keep the SMILES as scraped (no RDKit)")
+    args = parser.parse_args()
+
+    if Chem is None and not args.no_canonical:
+        print("RDKit is not installed: components are trimmed but not canonicalised (pip install rdkit)")
+    rows = normalize(args.input, args.output, canonical=not args.no_canonical)
+    info = canonical_smiles.cache_info()
+    print(f"Wrote {rows} component rows ({info.hits} canonical SMILES cache hits, {info.misses} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Content-addressed LRU cache of parsed ORD component modals.
+
+Datasets reuse the same reagents, solvents and catalysts across hundreds of
+reactions. Each '<>' button sits in a component card whose visible text
+(identifiers, amount, role) already describes the component, so the card
+text, hashed together with the section, identifies the payload behind the
+modal. A known component is answered from the cache without the modal
+round-trip; buttons without a card of their own are never cached.
+
+The card text is a proxy, not the payload itself: two components with the
+same visible text but e.g. a different role or amount detail in the payload
+would share one entry. The cache is therefore opt-in (ORD_SCRAPER.py
+--component-cache N), for datasets where the cards are known to be distinct.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from scraper_helpers import metrics
+
+# Visible text of the closest ancestor of the '<>' button that holds no other button
+CARD_TEXT_JS = """
+var node = arguments[0];
+while (node.parentElement && node.parentElement.querySelectorAll('.button').length === 1) {
+    node = node.parentElement;
+}
+return node === arguments[0] ? '' : node.innerText;
+"""
+DEFAULT_SIZE = 4096
+
+
+def component_key(section: str, card_text: str):
+    """Cache key for a component card; None when the card has nothing but the button."""
+    text = " ".join((card_text or "").replace("<>", " ").split())
+    if not text:
+        return None
+    return hashlib.sha1(f"{section}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+class ComponentCache:
+    """Thread-safe LRU of key -> (data_type, value, index) rows, bounded to `size` entries."""
+
+    def __init__(self, size: int = DEFAULT_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            rows = self._entries.get(key)
+            if rows is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        metrics.count("component_cache_hits" if rows is not None else "component_cache_misses")
+        return rows
+
+    def put(self, key, rows: list) -> None:
+        if key is None or not rows:
+            return
+        with self._lock:
+            self._entries[key] = tuple(rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        """Copy of the cached entries, e.g. to hand their keys to a browser-side script."""
+        with self._lock:
+            return dict(self._entries)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,107 @@
+"""Bulk export path for ORD: fetch a whole reaction (or dataset) as JSON in one
+request instead of clicking every '<>' button in the browser.
+
+The URLs are templates supplied on the command line, e.g.
+
+    --dataset-export-url "http://localhost:8000/datasets/{dataset_id}.json"
+    --reaction-export-url "http://localhost:8000/reactions/{reaction_id}.json"
+
+A reaction is ORD's Reaction message in its JSON form ("inputs" keyed by
+input name with "components", "outcomes" with "products"); a dataset is an
+object with a "reactions" list or a bare list of reactions. Field names may be
+camelCase or snake_case. Any fetch or format problem returns None so the
+caller can fall back to the modal walk.
+"""
+
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper_helpers import ord_payload
+
+REQUEST_TIMEOUT = 30
+
+log = logging.getLogger(__name__)
+
+
+def _field(message: dict, snake_name: str):
+    """Look a field up by its snake_case or camelCase JSON name."""
+    if snake_name in message:
+        return message[snake_name]
+    head, *rest = snake_name.split("_")
+    return message.get(head + "".join(part.title() for part in rest))
+
+
+def component_rows(component: dict) -> list:
+    """(data_type, value, index) rows for one component, as the modal walk would save them."""
+    payload = ord_payload.parse_component(component)
+    return ord_payload.payload_rows(payload, _field(component, "reaction_role"))
+
+
+def reaction_rows(reaction: dict) -> list:
+    """(section, tab, data_type, value, index) rows for every input and product component."""
+    rows = []
+    inputs = _field(reaction, "inputs") or {}
+    for input_name, reaction_input in inputs.items():
+        for component in _field(reaction_input, "components") or []:
+            for data_type, value, idx in component_rows(component):
+                rows.append(("Inputs", input_name, data_type, value, idx))
+
+    product_num = 0
+    for outcome in _field(reaction, "outcomes") or []:
+        for product in _field(outcome, "products") or []:
+            product_num += 1
+            for data_type, value, idx in component_rows(product):
+                rows.append(("Outcomes", f"Product {product_num}", data_type, value, idx))
+    return rows
+
+
+def reaction_id_from_url(url: str) -> str:
+    """The last path segment of a 'View Full Details' URL, e.g. ord-<hex>."""
+    return url.rstrip("/").split("/")[-1].split("?")[0]
+
+
+class OrdExporter:
+    def __init__(self, dataset_template: str = None, reaction_template: str = None, pool_size: int = 10):
+        self.dataset_template = dataset_template
+        self.reaction_template = reaction_template
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _fetch_json(self, url: str):
+        try:
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            log.warning("Export fetch failed for %s: %s", url, e)
+            return None
+
+    def dataset_reactions(self, dataset_id: str):
+        """List of reaction dicts for a whole dataset, or None when unavailable."""
+        if not self.dataset_template:
+            return None
+        payload = self._fetch_json(self.dataset_template.format(dataset_id=dataset_id))
+        if isinstance(payload, dict):
+            payload = payload.get("reactions")
+        if not isinstance(payload, list) or not payload:
+            return None
+        return payload
+
+    def reaction_rows(self, reaction_url: str):
+        """Rows for one reaction via the reaction export, or None when unavailable."""
+        if not self.reaction_template:
+            return None
+        reaction = self._fetch_json(self.reaction_template.format(reaction_id=reaction_id_from_url(reaction_url)))
+        if isinstance(reaction, dict) and "reaction" in reaction:
+            reaction = reaction["reaction"]
+        if not isinstance(reaction, dict):
+            return None
+        rows = reaction_rows(reaction)
+        return rows or None
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,112 @@
+"""Enumerate every reaction on an ORD dataset page in one script call.
+
+The dataset page is a Vue app that pages through the dataset's reactions on
+the client, so the full list is already in the component state: the page
+never has to be scrolled, re-paginated or rendered again. LISTING_JS walks the
+Vue component tree (Vue 3 `__vue_app__` or Vue 2 `__vue__`) and returns every
+reaction ID in document order. When no Vue state is reachable it falls back
+to the detail links rendered in the DOM. Detail URLs follow the href of any
+rendered link, or REACTION_PATH otherwise.
+
+The script also reports the dataset's reaction total when the page states
+one: a numeric total/count field in the component state, or else an
+"N reactions" text. A listing shorter than that total is incomplete (state
+still loading, or only the current page held client-side), and the caller
+falls back to the page-size select.
+"""
+
+import re
+from urllib.parse import urljoin
+
+REACTION_PATH = "/id/{reaction_id}"
+REACTION_ID_RE = re.compile(r"ord-[0-9a-f]{32}")
+
+LISTING_JS = r"""
+const idRe = /^ord-[0-9a-f]{32}$/;
+const totalKeyRe = /^(num_?reactions|numReactions|reaction_?count|reactionCount|total_?reactions|totalReactions|total|total_?count|totalCount)$/;
+const totals = [];
+const ids = [];
+const seenIds = new Set();
+const seen = new WeakSet();
+function addId(value) {
+    if (!seenIds.has(value)) { seenIds.add(value); ids.push(value); }
+}
+function scan(value, depth) {
+    if (typeof value === 'string') { if (idRe.test(value)) addId(value); return; }
+    if (!value || typeof value !== 'object' || depth > 8 || seen.has(value)) return;
+    if (value instanceof Node || value === window) return;
+    seen.add(value);
+    try {
+        for (const key of Object.keys(value)) {
+            if (key.startsWith('_') || key.startsWith('$')) continue;
+            if (typeof value[key] === 'number' && totalKeyRe.test(key)) totals.push(value[key]);
+            scan(value[key], depth + 1);
+        }
+    } catch (e) {}
+}
+function visitVue3(instance, depth) {
+    if (!instance || depth > 200 || seen.has(instance)) return;
+    seen.add(instance);
+    scan(instance.setupState, 0);
+    scan(instance.data, 0);
+    scan(instance.props, 0);
+    visitVNode(instance.subTree, depth + 1);
+}
+function visitVNode(vnode, depth) {
+    if (!vnode || depth > 200) return;
+    if (vnode.component) visitVue3(vnode.component, depth);
+    if (Array.isArray(vnode.children)) vnode.children.forEach(child => visitVNode(child, depth + 1));
+    if (vnode.suspense) visitVNode(vnode.suspense.activeBranch, depth + 1);
+}
+function visitVue2(vm, depth) {
+    if (!vm || depth > 200) return;
+    scan(vm.$data, 0);
+    scan(vm._props, 0);
+    (vm.$children || []).forEach(child => visitVue2(child, depth + 1));
+}
+for (const el of document.querySelectorAll('[data-v-app], #app, body > div')) {
+    if (el.__vue_app__ && el.__vue_app__._instance) visitVue3(el.__vue_app__._instance, 0);
+    else if (el.__vue__) visitVue2(el.__vue__, 0);
+}
+const source = ids.length ? 'vue' : 'dom';
+const hrefs = [];
+for (const a of document.querySelectorAll('a[href*="ord-"]')) {
+    const match = a.href.match(/ord-[0-9a-f]{32}/);
+    if (!match) continue;
+    hrefs.push(a.href);
+    if (source === 'dom') addId(match[0]);
+}
+let total = totals.length ? Math.max(...totals) : null;
+if (total === null && document.body) {
+    const match = document.body.innerText.match(/([\d,]+)\s+reactions\b/i);
+    if (match) total = parseInt(match[1].replace(/,/g, ''), 10);
+}
+return {source: source, ids: ids, hrefs: hrefs, total: total};
+"""
+
+
+def detail_url_template(dataset_url: str, hrefs: list) -> str:
+    """URL template for a reaction's detail page, taken from a rendered link when there is one."""
+    for href in hrefs:
+        match = REACTION_ID_RE.search(href)
+        if match:
+            return href[:match.start()] + "{reaction_id}" + href[match.end():]
+    return urljoin(dataset_url, REACTION_PATH)
+
+
+def detail_urls(driver, dataset_url: str):
+    """(detail URLs of the reactions listed, "vue" or "dom", reported total or None), from one script call."""
+    listing = driver.execute_script(LISTING_JS) or {}
+    template = detail_url_template(dataset_url, listing.get("hrefs") or [])
+    urls = [template.format(reaction_id=reaction_id) for reaction_id in listing.get("ids") or []]
+    return urls, listing.get("source", "dom"), listing.get("total")
+
+
+def complete(urls: list, total) -> bool:
+    """Whether a listing has every reaction the page reports (any non-empty one when no total is shown)."""
+    return bool(urls) and (total is None or len(urls) >= total)
+
+
+def merge(*url_lists) -> list:
+    """The URLs of several listings, each once, in first-seen order."""
+    return list(dict.fromkeys(url for urls in url_lists for url in urls))
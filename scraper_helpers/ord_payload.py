@@ -0,0 +1,152 @@
+"""Single-pass extraction of identifiers, types, values and reaction roles from
+the `<pre>` payloads shown in ORD component modals.
+
+The payload is JSON, possibly followed by protobuf text format lines
+(key: value). `parse_payload` decodes the JSON part once with the C JSON
+decoder and walks the resulting structure; anything it cannot decode is
+covered by a single regex scan. Either way the cost is linear in the payload
+size instead of re-slicing the text for every value.
+
+This is not faster for typical payloads. Up to a few hundred identifiers
+(about 10 KB), the old str.find scan was quicker: 0.3x at 1 identifier and
+about 0.9x at 200 (benchmarks/bench_ord_payload.py). The new parser only
+wins on large payloads: about 1.3x at 500 identifiers and 3-4x at 2000.
+Either way it is microseconds per modal, against the milliseconds of the
+modal round-trip. The old scan is not kept for small payloads because it
+decoded no escapes and cut numeric values at the next comma.
+"""
+
+import json
+import re
+
+# All <pre> texts of the open modal in one WebDriver round-trip
+PRE_TEXTS_JS = "return Array.from(document.querySelectorAll('pre'), function (pre) { return pre.innerText; });"
+
+_PAIR_RE = re.compile(
+    r'(?<![\w"])"?(?P<key>value|type|reaction_role)"?\s*:\s*'
+    r'(?:(?P<string>"(?:[^"\\]|\\.)*")|(?P<token>[^\s,}\]\[{"]+))'
+)
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_string(quoted: str) -> str:
+    if "\\" not in quoted:
+        return quoted[1:-1]
+    try:
+        return json.loads(quoted)
+    except ValueError:
+        return quoted[1:-1]
+
+
+def _new_result(pre_text: str) -> dict:
+    return {
+        "has_identifiers": "identifiers" in pre_text,
+        "identifiers": [],
+        "type": None,
+        "value": None,
+        "reaction_role": None,
+    }
+
+
+def _add_pair(result: dict, key: str, value, is_string: bool) -> None:
+    if key == "value":
+        if is_string:
+            result["identifiers"].append(value)
+        if result["value"] is None:
+            result["value"] = value
+    elif key == "type":
+        if is_string and result["type"] is None:
+            result["type"] = value
+    elif key in ("reaction_role", "reactionRole"):
+        if result["reaction_role"] is None:
+            result["reaction_role"] = value
+
+
+def _walk(node, result: dict) -> None:
+    """Visit a decoded JSON structure in document order."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, (dict, list)):
+                _walk(value, result)
+            elif isinstance(value, str):
+                _add_pair(result, key, value, True)
+            elif value is not None and not isinstance(value, bool):
+                _add_pair(result, key, repr(value), False)
+    elif isinstance(node, list):
+        for item in node:
+            _walk(item, result)
+
+
+def _scan(text: str, result: dict) -> None:
+    """Regex fallback for text the JSON decoder cannot handle (e.g. protobuf text format)."""
+    for match in _PAIR_RE.finditer(text):
+        string = match.group("string")
+        if string is not None:
+            _add_pair(result, match.group("key"), _decode_string(string), True)
+        else:
+            _add_pair(result, match.group("key"), match.group("token"), False)
+
+
+def parse_payload(pre_text: str) -> dict:
+    """Parse one payload into {'has_identifiers', 'identifiers', 'type', 'value', 'reaction_role'}.
+
+    `identifiers` holds every string "value" (the identifier values when the
+    payload has an identifiers block); `type`/`value` are the first ones found.
+    """
+    result = _new_result(pre_text)
+    text = pre_text.lstrip()
+    if text.startswith(("{", "[")):
+        try:
+            node, end = _JSON_DECODER.raw_decode(text)
+        except ValueError:
+            pass
+        else:
+            _walk(node, result)
+            # Protobuf text lines such as 'reaction_role: REACTANT' may follow the JSON
+            _scan(text[end:], result)
+            return result
+    _scan(pre_text, result)
+    return result
+
+
+def parse_component(component: dict) -> dict:
+    """Same result as `parse_payload` for a component that is already decoded JSON."""
+    result = _new_result("")
+    result["has_identifiers"] = "identifiers" in component
+    _walk(component, result)
+    return result
+
+
+def payload_rows(payload: dict, reaction_role=None) -> list:
+    """(data_type, value, index) rows for one parsed payload, in the order the scraper saves them."""
+    rows = []
+    if payload["has_identifiers"]:
+        for idx, val in enumerate(payload["identifiers"], 1):
+            rows.append(("identifier", val, idx))
+    else:
+        if payload["type"] is not None:
+            rows.append(("type", payload["type"], 1))
+        if payload["value"] is not None:
+            rows.append(("value", payload["value"], 1))
+    if reaction_role is not None:
+        rows.append(("reaction_role", reaction_role, 1))
+    return rows
+
+
+def extract_rows(pre_texts: list) -> list:
+    """(data_type, value, index) rows for a modal.
+
+    Identifier values come from the first <pre> when it has an identifiers
+    block, otherwise its first type and value; the reaction role comes from the
+    first <pre> that mentions one.
+    """
+    if not pre_texts:
+        return []
+
+    payload = parse_payload(pre_texts[0])
+    role = None
+    for pre_text in pre_texts:
+        if "reaction_role" in pre_text:
+            role = payload["reaction_role"] if pre_text is pre_texts[0] else parse_payload(pre_text)["reaction_role"]
+            break
+    return payload_rows(payload, role)
@@ -0,0 +1,148 @@
+"""One-script extraction of every component payload on an ORD reaction page.
+
+The click-by-click path costs several WebDriver round-trips per tab and per
+'<>' button (find_elements to dodge stale elements, scrollIntoView, click,
+waits, reading the <pre>s, closing). `snapshot()` instead injects
+SNAPSHOT_JS once: it walks the Inputs tabs and the Products tabs inside the
+browser, opens each component modal, collects its <pre> texts and card text,
+and returns everything as one JSON-serialisable list.
+
+Components whose card is already in the `ord_cache.ComponentCache` are not
+opened; their cache keys are passed in and the script skips matching cards
+(the keys are SHA-1 hashes, computed with crypto.subtle, which is available
+on https and localhost pages; elsewhere every modal is opened).
+
+SECTIONS holds the locators shared with the click-by-click path.
+"""
+
+from scraper_helpers import metrics, ord_cache, ord_payload
+
+SECTIONS = [
+    {
+        "name": "Inputs",
+        "nav": "//div[@class='nav-item' and contains(text(), 'inputs')]",
+        "ready": "//div[@id='inputs']//div[@class='tabs']",
+        "tabs": "//div[@id='inputs']//div[@class='tabs']//div[contains(@class, 'tab')]",
+        "buttons": "//div[@class='input']//div[@class='button' and contains(text(), '<>')]",
+    },
+    {
+        "name": "Outcomes",
+        "nav": "//div[@class='nav-item' and contains(text(), 'outcomes')]",
+        "ready": "//div[@class='title' and contains(text(), 'Products')]",
+        "tabs": "//div[@class='title' and contains(text(), 'Products')]/following-sibling::div[@class='sub-section']"
+                "//div[@class='tabs']//div[contains(@class, 'tab')]",
+        "buttons": "//div[@class='title' and contains(text(), 'Products')]/following-sibling::div[@class='sub-section']"
+                   "//div[@class='button' and contains(text(), '<>')]",
+    },
+]
+CLOSE_XPATH = "//div[@class='close']"
+
+# arguments: sections, close XPath, known cache keys, per-wait timeout (ms), callback
+SNAPSHOT_JS = """
+var sections = arguments[0], closeXPath = arguments[1], known = new Set(arguments[2]), timeout = arguments[3];
+var done = arguments[arguments.length - 1];
+
+function all(xpath) {
+    var result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+}
+function sleep(ms) { return new Promise(function (resolve) { setTimeout(resolve, ms); }); }
+async function waitFor(test, ms) {
+    var end = Date.now() + ms, value;
+    while (!(value = test()) && Date.now() < end) await sleep(10);
+    return value;
+}
+function cardText(button) {
+    var node = button;
+    while (node.parentElement && node.parentElement.querySelectorAll('.button').length === 1) node = node.parentElement;
+    return node === button ? '' : node.innerText;
+}
+function normalize(text) { return text.replace(/<>/g, ' ').split(/\\s+/).filter(Boolean).join(' '); }
+async function cacheKey(section, text) {
+    text = normalize(text);
+    if (!text || !known.size || !(window.crypto && crypto.subtle)) return null;
+    var digest = await crypto.subtle.digest('SHA-1', new TextEncoder().encode(section + '\\x1f' + text));
+    return Array.from(new Uint8Array(digest), function (b) { return b.toString(16).padStart(2, '0'); }).join('');
+}
+async function readModal(button) {
+    button.scrollIntoView(true);
+    button.click();
+    var pres = await waitFor(function () {
+        var found = Array.from(document.querySelectorAll('pre'));
+        return found.some(function (pre) { return pre.innerText.trim(); }) ? found : null;
+    }, timeout);
+    var texts = pres ? pres.map(function (pre) { return pre.innerText; }) : [];
+    var close = all(closeXPath)[0];
+    if (close) {
+        close.click();
+        await waitFor(function () { return !all(closeXPath).length; }, timeout);
+    }
+    return texts;
+}
+async function walk(section) {
+    var nav = all(section.nav)[0];
+    if (!nav) throw new Error("no '" + section.name + "' navbar item");
+    nav.click();
+    if (!await waitFor(function () { return all(section.ready).length; }, timeout)) {
+        throw new Error(section.name + ' section did not load');
+    }
+    var components = [], tabCount = all(section.tabs).length;
+    for (var t = 0; t < tabCount; t++) {
+        var tab = all(section.tabs)[t], tabText = tab ? tab.innerText.trim() : null;
+        if (t > 0 && tab) {
+            var oldClass = tab.className;
+            tab.scrollIntoView(true);
+            tab.click();
+            await waitFor(function () { return tab.className !== oldClass; }, 2000);
+        }
+        var buttons = all(section.buttons);
+        for (var b = 0; b < buttons.length; b++) {
+            var text = cardText(buttons[b]), key = await cacheKey(section.name, text);
+            if (key !== null && known.has(key)) {
+                components.push({section: section.name, tab: tabText, card: text, key: key, pre_texts: null});
+                continue;
+            }
+            var preTexts = await readModal(buttons[b]);
+            components.push({section: section.name, tab: tabText, card: text, key: key, pre_texts: preTexts});
+            buttons = all(section.buttons);
+        }
+    }
+    return components;
+}
+(async function () {
+    var components = [];
+    for (var s = 0; s < sections.length; s++) components = components.concat(await walk(sections[s]));
+    return components;
+})().then(done, function (error) { done({error: String(error)}); });
+"""
+
+
+def snapshot(driver, timeout: float = 5.0, component_cache=None, script_timeout: float = 300.0) -> list:
+    """(section, tab, rows) for every component on the open reaction page, in page order.
+
+    Raises RuntimeError when the script fails, including when a section's
+    navbar item is missing or the section never loads, so the caller can
+    fall back to clicking through the tabs (which logs those cases).
+    """
+    cached = component_cache.snapshot() if component_cache is not None else {}
+    driver.set_script_timeout(script_timeout)
+    with metrics.timed("extract"):
+        result = driver.execute_async_script(SNAPSHOT_JS, SECTIONS, CLOSE_XPATH, list(cached), int(timeout * 1000))
+    if not isinstance(result, list):
+        raise RuntimeError((result or {}).get("error", "snapshot script returned nothing"))
+
+    components = []
+    for component in result:
+        section = component["section"]
+        key = ord_cache.component_key(section, component["card"])
+        if component["pre_texts"] is None:
+            # Skipped by the script: the rows are in the copy taken before the call even if evicted since
+            rows = list(component_cache.get(component["key"]) or cached[component["key"]])
+        else:
+            rows = ord_payload.extract_rows(component["pre_texts"])
+            if component_cache is not None:
+                component_cache.put(key, rows)
+        components.append((section, component["tab"], rows))
+    return components
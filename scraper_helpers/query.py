@@ -0,0 +1,346 @@
+"""Indexed lookups over scraped reactions, by DOI, dataset and SMILES component.
+
+    python -m scraper_helpers.query build CRD_SCRAPER/scraped_smiles_data.csv scraped_data.csv
+    python -m scraper_helpers.query doi 10.1021/acs.orglett.0c01234
+    python -m scraper_helpers.query smiles 'CC(=O)O' --role product
+    python -m scraper_helpers.query dataset ord_dataset-0b6c1f2e...
+    python -m scraper_helpers.query role CATALYST --dataset ord_dataset-0b6c1f2e...
+    python -m scraper_helpers.query value 'triethylamine' --limit 0
+
+`build` streams CRD output CSVs (or a --refresh store) and ORD output CSVs
+into an SQLite index file. Each CRD reaction is stored once, indexed on its
+DOI (the crd_store key, so any of its reaction data URLs finds it too), and
+exploded into its reactant/reagent/product components, which form an
+inverted index from canonical SMILES to reactions (see normalize.py). ORD
+rows are grouped back into the components they were read from (identifier
+values plus reaction role), with indexes on dataset ID, role and every
+identifier value. Lookups are B-tree index seeks, so they take milliseconds
+however many rows are indexed.
+
+The index is persistent: `build` again only reloads inputs whose size or
+modification time changed, replacing the rows they contributed.
+
+    sources         (id, path, kind, size, mtime, rows, loaded_at)
+    crd_reactions   (id, source_id, doi, reaction_url, product_page, smiles_index, reactants, reagents, product)
+    crd_components  (reaction_id, role, component_index, smiles, canonical_smiles)
+    ord_components  (id, source_id, dataset_id, section, tab, role)
+    ord_values      (component_id, data_type, value, idx)
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from itertools import islice
+
+from scraper_helpers import normalize
+from scraper_helpers.convert import iter_records
+from scraper_helpers.crd_store import doi_from_url
+from scraper_helpers.sinks import SMILES_SCHEMA
+
+DEFAULT_PATH = "reactions.index.sqlite"
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, kind TEXT NOT NULL, size INTEGER NOT NULL,
+    mtime REAL NOT NULL, rows INTEGER NOT NULL, loaded_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS crd_reactions (
+    id INTEGER PRIMARY KEY, source_id INTEGER NOT NULL, doi TEXT NOT NULL, reaction_url TEXT NOT NULL,
+    product_page INTEGER, smiles_index INTEGER, reactants TEXT, reagents TEXT, product TEXT);
+CREATE TABLE IF NOT EXISTS crd_components (
+    reaction_id INTEGER NOT NULL, role TEXT NOT NULL, component_index INTEGER NOT NULL,
+    smiles TEXT NOT NULL, canonical_smiles TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS ord_components (
+    id INTEGER PRIMARY KEY, source_id INTEGER NOT NULL, dataset_id TEXT NOT NULL, section TEXT, tab TEXT, role TEXT);
+CREATE TABLE IF NOT EXISTS ord_values (
+    component_id INTEGER NOT NULL, data_type TEXT NOT NULL, value TEXT NOT NULL, idx INTEGER);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS crd_reactions_by_doi ON crd_reactions (doi);
+CREATE INDEX IF NOT EXISTS crd_reactions_by_source ON crd_reactions (source_id);
+CREATE INDEX IF NOT EXISTS crd_components_by_canonical ON crd_components (canonical_smiles, role);
+CREATE INDEX IF NOT EXISTS crd_components_by_smiles ON crd_components (smiles, role);
+CREATE INDEX IF NOT EXISTS crd_components_by_reaction ON crd_components (reaction_id);
+CREATE INDEX IF NOT EXISTS ord_components_by_dataset ON ord_components (dataset_id, role);
+CREATE INDEX IF NOT EXISTS ord_components_by_role ON ord_components (role);
+CREATE INDEX IF NOT EXISTS ord_components_by_source ON ord_components (source_id);
+CREATE INDEX IF NOT EXISTS ord_values_by_value ON ord_values (value);
+CREATE INDEX IF NOT EXISTS ord_values_by_component ON ord_values (component_id);
+"""
+CRD_COLUMNS = "r.id, r.doi, r.reaction_url, r.product_page, r.smiles_index, r.reactants, r.reagents, r.product"
+
+
+def _same_component(row: dict, previous: dict) -> bool:
+    """Whether an ORD row continues the component of the row before it.
+
+    Every modal is saved as identifier rows numbered from 1 (or a type and/or
+    value row) followed by an optional reaction_role row (see ord_payload.payload_rows).
+    """
+    if previous is None or previous["data_type"] == "reaction_role" or any(
+            row[key] != previous[key] for key in ("dataset_id", "section", "tab")):
+        return False
+    data_type = row["data_type"]
+    if data_type == "identifier":
+        return str(row["index"]) != "1"
+    if data_type == "value":
+        return previous["data_type"] == "type"
+    return data_type == "reaction_role"
+
+
+def group_ord_components(records):
+    """Yield (first row, [rows]) per component of a stream of ORD output rows."""
+    rows = []
+    for record in records:
+        if rows and not _same_component(record, rows[-1]):
+            yield rows[0], rows
+            rows = []
+        rows.append(record)
+    if rows:
+        yield rows[0], rows
+
+
+def _read_source(path: str):
+    """('crd' or 'ord', records) for a CRD/ORD output CSV or a CRD --refresh store."""
+    if path.endswith((".sqlite", ".db")):
+        return "crd", normalize.read_records(path)
+    records = iter_records(path)
+    first = next(records, None)
+    if first is None:
+        return "crd", iter(())
+
+    def chain():
+        yield first[1]
+        for _, record in records:
+            yield record
+    return ("crd" if first[0] is SMILES_SCHEMA else "ord"), chain()
+
+
+class ReactionIndex:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA + INDEXES)
+        self._conn.commit()
+
+    # ---- loading ----
+
+    def load(self, path: str, force: bool = False) -> int:
+        """Index one output file; returns the rows read, or 0 when it is unchanged since it was last loaded."""
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self._conn.execute("SELECT id, size, mtime FROM sources WHERE path = ?", (key,)).fetchone()
+        if known and not force and (known[1], known[2]) == (stat.st_size, stat.st_mtime):
+            return 0
+        kind, records = _read_source(path)
+        with self._lock:
+            conn = self._conn
+            conn.execute("PRAGMA synchronous = OFF")
+            try:
+                if known:
+                    self._drop_source(known[0])
+                source_id = conn.execute(
+                    "INSERT OR REPLACE INTO sources (id, path, kind, size, mtime, rows, loaded_at)"
+                    " VALUES (?, ?, ?, ?, ?, 0, ?)",
+                    (known[0] if known else None, key, kind, stat.st_size, stat.st_mtime, time.time())).lastrowid
+                rows = (self._load_crd if kind == "crd" else self._load_ord)(source_id, records)
+                conn.execute("UPDATE sources SET rows = ? WHERE id = ?", (rows, source_id))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute("PRAGMA synchronous = FULL")
+        return rows
+
+    def _drop_source(self, source_id: int) -> None:
+        self._conn.execute("DELETE FROM crd_components WHERE reaction_id IN"
+                           " (SELECT id FROM crd_reactions WHERE source_id = ?)", (source_id,))
+        self._conn.execute("DELETE FROM crd_reactions WHERE source_id = ?", (source_id,))
+        self._conn.execute("DELETE FROM ord_values WHERE component_id IN"
+                           " (SELECT id FROM ord_components WHERE source_id = ?)", (source_id,))
+        self._conn.execute("DELETE FROM ord_components WHERE source_id = ?", (source_id,))
+
+    def _next_id(self, table: str) -> int:
+        return (self._conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0) + 1
+
+    def _load_crd(self, source_id: int, records) -> int:
+        next_id = self._next_id("crd_reactions")
+        loaded = 0
+        records = iter(records)
+        while True:
+            batch = list(islice(records, BATCH_SIZE))
+            if not batch:
+                return loaded
+            reactions, components = [], []
+            for record in batch:
+                reactions.append((next_id, source_id, doi_from_url(record["reaction_url"]), record["reaction_url"],
+                                  record["product_page"], record["smiles_index"], record["reactants"],
+                                  record["reagents"], record["product"]))
+                components.extend((next_id, c["role"], c["component_index"], c["smiles"], c["canonical_smiles"])
+                                  for c in normalize.explode([record]))
+                next_id += 1
+            self._conn.executemany("INSERT INTO crd_reactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", reactions)
+            self._conn.executemany("INSERT INTO crd_components VALUES (?, ?, ?, ?, ?)", components)
+            loaded += len(batch)
+
+    def _load_ord(self, source_id: int, records) -> int:
+        next_id = self._next_id("ord_components")
+        loaded = 0
+        groups = group_ord_components(records)
+        while True:
+            batch = list(islice(groups, BATCH_SIZE))
+            if not batch:
+                return loaded
+            components, values = [], []
+            for first, rows in batch:
+                role = next((row["value"] for row in rows if row["data_type"] == "reaction_role"), None)
+                components.append((next_id, source_id, first["dataset_id"], first["section"], first["tab"], role))
+                values.extend((next_id, row["data_type"], row["value"], row["index"])
+                              for row in rows if row["data_type"] != "reaction_role")
+                next_id += 1
+                loaded += len(rows)
+            self._conn.executemany("INSERT INTO ord_components VALUES (?, ?, ?, ?, ?, ?)", components)
+            self._conn.executemany("INSERT INTO ord_values VALUES (?, ?, ?, ?)", values)
+
+    # ---- queries ----
+
+    def _fetch(self, query: str, params=()) -> list:
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def by_doi(self, doi: str, limit: int = None) -> list:
+        """CRD reactions of a DOI or of any reaction data URL of it (keyed like crd_store), in scrape order."""
+        return self._fetch(f"SELECT {CRD_COLUMNS} FROM crd_reactions r WHERE r.doi = ?"
+                           " ORDER BY r.product_page, r.smiles_index LIMIT ?", (doi_from_url(doi.strip()), limit or -1))
+
+    def with_component(self, smiles: str, role: str = None, limit: int = None) -> list:
+        """CRD reactions with `smiles` as a component (in any role, or 'reactant', 'reagent' or 'product').
+
+        The SMILES is canonicalised like the index (RDKit when installed), and
+        also matched as written.
+        """
+        canonical = normalize.canonical_smiles(smiles) or smiles.strip()
+        role_clause = " AND c.role = ?" if role else ""
+        return self._fetch(
+            f"SELECT DISTINCT {CRD_COLUMNS}, c.role FROM crd_components c JOIN crd_reactions r ON r.id = c.reaction_id"
+            f" WHERE (c.canonical_smiles = ? OR c.smiles = ?){role_clause} ORDER BY r.id LIMIT ?",
+            [canonical, smiles.strip()] + ([role] if role else []) + [limit or -1])
+
+    def ord_components(self, dataset_id: str = None, role: str = None, value: str = None, limit: int = None) -> list:
+        """ORD components filtered by dataset, reaction role (e.g. 'CATALYST') and/or an identifier value.
+
+        Each component is a dict with its dataset_id, section, tab, role and
+        `values` (the identifier, type and value rows, in order).
+        """
+        clauses, params = [], []
+        if dataset_id:
+            clauses.append("o.dataset_id = ?")
+            params.append(dataset_id)
+        if role:
+            clauses.append("o.role = ?")
+            params.append(role)
+        if value:
+            clauses.append("o.id IN (SELECT component_id FROM ord_values WHERE value = ?)")
+            params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._fetch(
+            "SELECT o.*, v.data_type, v.value FROM (SELECT o.id, o.dataset_id, o.section, o.tab, o.role"
+            f" FROM ord_components o{where} ORDER BY o.id LIMIT ?) o"
+            " LEFT JOIN ord_values v ON v.component_id = o.id ORDER BY o.id, v.rowid", params + [limit or -1])
+        components = []
+        for row in rows:
+            data_type, value = row.pop("data_type"), row.pop("value")
+            if not components or components[-1]["id"] != row["id"]:
+                components.append(dict(row, values=[]))
+            if data_type is not None:
+                components[-1]["values"].append((data_type, value))
+        return components
+
+    def counts(self) -> dict:
+        with self._lock:
+            return {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("crd_reactions", "crd_components", "ord_components", "ord_values")}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _print_reactions(reactions: list) -> None:
+    for r in reactions:
+        role = f"\t{r['role']}" if "role" in r else ""
+        print(f"{r['reaction_url']}\t{r['product_page']}\t{r['smiles_index']}\t"
+              f"{r['reactants']}>{r['reagents']}>{r['product']}{role}")
+
+
+def _print_components(components: list) -> None:
+    for c in components:
+        values = "; ".join(f"{data_type}={value}" for data_type, value in c["values"])
+        print(f"{c['dataset_id']}\t{c['section']}\t{c['tab']}\t{c['role'] or ''}\t{values}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query an index of scraped CRD and ORD reactions")
+    parser.add_argument("--index", default=DEFAULT_PATH, help=f"Index file (default: {DEFAULT_PATH})")
+    parser.add_argument("--limit", type=int, default=100, help="Maximum results to print (default: 100; 0: all)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Index (or re-index changed) output files")
+    build.add_argument("inputs", nargs="+", help="scraped_smiles_data.csv, a --refresh store or scraped_data.csv")
+    build.add_argument("--force", action="store_true", help="Reload inputs even if unchanged")
+    doi = commands.add_parser("doi", help="CRD reactions of a DOI or one of its reaction data URLs")
+    doi.add_argument("doi")
+    component = commands.add_parser("smiles", help="CRD reactions with a SMILES component")
+    component.add_argument("smiles")
+    component.add_argument("--role", choices=[role for _, role in normalize.ROLES])
+    dataset = commands.add_parser("dataset", help="ORD components of a dataset")
+    dataset.add_argument("dataset_id")
+    dataset.add_argument("--role", help="Only components with this reaction role")
+    role = commands.add_parser("role", help="ORD components with a reaction role, e.g. CATALYST")
+    role.add_argument("role")
+    role.add_argument("--dataset", help="Only this dataset")
+    value = commands.add_parser("value", help="ORD components with an identifier value (SMILES, name, ...)")
+    value.add_argument("value")
+    for lookup in (doi, component, dataset, role, value):
+        # Also accepted after the command; SUPPRESS keeps a --limit given before it
+        lookup.add_argument("--limit", type=int, default=argparse.SUPPRESS,
+                            help="Maximum results to print (default: 100; 0: all)")
+    args = parser.parse_args()
+
+    index = ReactionIndex(args.index)
+    try:
+        start = time.perf_counter()
+        if args.command == "build":
+            for path in args.inputs:
+                rows = index.load(path, args.force)
+                print(f"{path}: {f'{rows} rows indexed' if rows else 'unchanged'}")
+            counts = index.counts()
+            print(f"{args.index}: {', '.join(f'{n} {table}' for table, n in counts.items())}"
+                  f" ({time.perf_counter() - start:.1f} s)")
+            return
+        limit = args.limit or None
+        if args.command == "doi":
+            results = index.by_doi(args.doi, limit)
+        elif args.command == "smiles":
+            results = index.with_component(args.smiles, args.role, limit)
+        elif args.command == "dataset":
+            results = index.ord_components(dataset_id=args.dataset_id, role=args.role, limit=limit)
+        elif args.command == "role":
+            results = index.ord_components(dataset_id=args.dataset, role=args.role, limit=limit)
+        else:
+            results = index.ord_components(value=args.value, limit=limit)
+        elapsed = time.perf_counter() - start
+        (_print_reactions if args.command in ("doi", "smiles") else _print_components)(results)
+        print(f"{len(results)} result(s) in {elapsed * 1000:.1f} ms")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
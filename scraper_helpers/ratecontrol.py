@@ -0,0 +1,198 @@
+"""Retries with jittered exponential backoff, and AIMD per-host rate control.
+
+`RetryPolicy` retries a failed call after base * 2**attempt seconds (capped,
+with +/-50% jitter) up to `attempts` times, within a retry budget of
+`budget_ratio` of all calls, so a site that is down does not turn every unit
+into a retry storm. The module-level policy (`configure()` / `policy()`) is
+used by page fetches and loads; its counts of retried and permanently failed
+calls end up in the metrics report.
+
+`AimdController` adapts each host's concurrency limit and request delay to
+the latency it measures: every response while the smoothed latency is within
+the target adds 1/limit to the limit and shortens the delay; when the
+smoothed latency exceeds the target or a request fails, the limit is halved
+(at most once per smoothed latency, like TCP's once per round trip). Failures
+at the minimum limit also double the delay. The target is `latency_factor`
+times the fastest smoothed latency seen for the host unless given explicitly.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+
+from scraper_helpers import metrics
+
+log = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 budget_ratio: float = 0.2, min_budget: int = 10):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.calls = 0
+        self.retried = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    def should_retry(self, attempt: int) -> bool:
+        """Whether a call that just failed for the `attempt`-th time may be retried; counts the retry."""
+        with self._lock:
+            budget = max(self.min_budget, self.budget_ratio * self.calls)
+            if attempt >= self.attempts or self.retried >= budget:
+                self.failed += 1
+                metrics.count("failed")
+                return False
+            self.retried += 1
+        metrics.count("retries")
+        return True
+
+    def started(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def call(self, fn, *args, retry_on=(Exception,), label: str = None, before_retry=None, **kwargs):
+        """fn(*args, **kwargs), retried on `retry_on` exceptions; the last one is re-raised."""
+        self.started()
+        attempt = 1
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except retry_on as e:
+                if not self.should_retry(attempt):
+                    raise
+                delay = self.backoff(attempt)
+                log.info("Retrying %s in %.1f s (attempt %s/%s): %s",
+                         label or getattr(fn, "__name__", "call"), delay, attempt + 1, self.attempts, e)
+                if before_retry is not None:
+                    before_retry()
+                time.sleep(delay)
+                metrics.observe("sleep", delay)
+                attempt += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "retried": self.retried, "failed": self.failed}
+
+
+_policy = RetryPolicy()
+
+
+def configure(attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0) -> RetryPolicy:
+    """Replace the module-level policy (e.g. from --retries / --retry-delay)."""
+    global _policy
+    _policy = RetryPolicy(attempts, base_delay, max_delay)
+    return _policy
+
+
+def policy() -> RetryPolicy:
+    return _policy
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--retries", type=int, default=3, metavar="N",
+                        help="Attempts per page load or unit before it counts as failed (default: 3)")
+    parser.add_argument("--retry-delay", type=float, default=1.0, metavar="SECONDS",
+                        help="Base of the jittered exponential backoff between attempts (default: 1.0)")
+
+
+class _HostState:
+    def __init__(self, limit: float, delay: float):
+        self.limit = limit
+        self.delay = delay
+        self.in_flight = 0
+        self.last_start = 0.0
+        self.last_decrease = 0.0
+        self.latency = None  # smoothed (EWMA) latency
+        self.best = None  # fastest smoothed latency seen
+        self.condition = None
+
+
+class AimdController:
+    def __init__(self, initial: int = 2, min_limit: int = 1, max_limit: int = 16, delay: float = 0.0,
+                 min_delay: float = 0.0, max_delay: float = 5.0, target_latency: float = None,
+                 latency_factor: float = 2.0, smoothing: float = 0.3):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.increases = 0
+        self.decreases = 0
+        initial = min(max(initial, min_limit), self.max_limit)
+        self._hosts = defaultdict(lambda: _HostState(float(initial), delay))
+
+    def target(self, host: str):
+        state = self._hosts[host]
+        if self.target_latency is not None:
+            return self.target_latency
+        return state.best * self.latency_factor if state.best is not None else None
+
+    async def acquire(self, host: str) -> None:
+        """Wait for a free slot under the host's current limit, then for its delay since the last start.
+
+        The slot and the start time are taken under the host's condition, the
+        delay is slept outside it, so releases are never held up by a sleeper.
+        """
+        state = self._hosts[host]
+        if state.condition is None:
+            state.condition = asyncio.Condition()
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.in_flight < int(state.limit))
+            state.in_flight += 1
+            now = time.monotonic()
+            state.last_start = max(now, state.last_start + state.delay)
+            wait = state.last_start - now
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                async with state.condition:
+                    state.in_flight -= 1
+                    state.condition.notify_all()
+                raise
+            metrics.observe("sleep", wait)
+
+    async def release(self, host: str, latency: float, ok: bool) -> None:
+        """Free the slot and adapt the host's limit and delay to how the request went."""
+        state = self._hosts[host]
+        if ok:
+            state.latency = latency if state.latency is None else (
+                self.smoothing * latency + (1 - self.smoothing) * state.latency)
+            state.best = state.latency if state.best is None else min(state.best, state.latency)
+        target = self.target(host)
+        now = time.monotonic()
+        if ok and (target is None or state.latency <= target):
+            # Additive increase: about +1 per limit's worth of fast responses
+            state.limit = min(self.max_limit, state.limit + 1.0 / state.limit)
+            state.delay = state.delay * 0.8 if state.delay * 0.8 > self.min_delay + 0.01 else self.min_delay
+            self.increases += 1
+        elif now - state.last_decrease >= (state.latency or 0.0):
+            # Multiplicative decrease on errors and slow responses, once per round trip
+            if not ok and state.limit <= self.min_limit:
+                state.delay = min(self.max_delay, max(state.delay * 2, 0.05))
+            state.limit = max(self.min_limit, state.limit / 2)
+            state.last_decrease = now
+            self.decreases += 1
+        async with state.condition:
+            state.in_flight -= 1
+            state.condition.notify_all()
+
+    def snapshot(self) -> dict:
+        """host -> {'limit', 'delay', 'latency'} as currently adapted."""
+        return {host: {"limit": int(state.limit), "delay": round(state.delay, 3),
+                       "latency": round(state.latency, 3) if state.latency is not None else None}
+                for host, state in self._hosts.items()}
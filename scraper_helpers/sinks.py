@@ -0,0 +1,214 @@
+"""Long-lived, buffered row sinks shared by the scrapers.
+
+A sink opens its output once, buffers rows in memory and writes them in
+batches when `flush_rows` rows are pending or `flush_seconds` have passed since
+the last write, and on close. All methods are thread-safe, so one sink can be
+shared by concurrent workers.
+
+`CsvRowSink` writes the scrapers' traditional CSV files; `ParquetRowSink`
+writes typed columns (requires pyarrow) so analytics can read only the
+columns they need.
+"""
+
+import csv
+import os
+import threading
+import time
+
+from scraper_helpers import metrics
+
+# Typed column layouts for the columnar output
+ORD_SCHEMA = [
+    ("dataset_id", "string"),
+    ("section", "string"),
+    ("tab", "string"),
+    ("data_type", "string"),
+    ("value", "string"),
+    ("index", "int32"),
+]
+SMILES_SCHEMA = [
+    ("reaction_url", "string"),
+    ("product_page", "int32"),
+    ("smiles_index", "int32"),
+    ("reactants", "string"),
+    ("reagents", "string"),
+    ("product", "string"),
+    ("modal_title", "string"),
+    ("modal_content", "string"),
+]
+# One row per reaction component (see scraper_helpers/normalize.py)
+COMPONENT_SCHEMA = [
+    ("reaction_url", "string"),
+    ("product_page", "int32"),
+    ("smiles_index", "int32"),
+    ("role", "string"),
+    ("component_index", "int32"),
+    ("smiles", "string"),
+    ("canonical_smiles", "string"),
+]
+
+
+class _BufferedSink:
+    def __init__(self, filename: str, flush_rows: int, flush_seconds: float):
+        self.filename = filename
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.rows_written = 0
+        self.appending = False
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._callbacks = []
+        self._last_flush = time.monotonic()
+        self._closed = False
+
+    def _prepare(self, row):
+        return row
+
+    def _write_batch(self, rows: list) -> None:
+        raise NotImplementedError
+
+    def _close_output(self) -> None:
+        raise NotImplementedError
+
+    def write_rows(self, rows, on_flushed=None) -> None:
+        """Buffer `rows`.
+
+        `on_flushed` is called once these rows are on disk, e.g. to mark a unit
+        as done in the crawl journal only after its rows were actually saved.
+        """
+        with self._lock:
+            self._buffer.extend(self._prepare(row) for row in rows)
+            if on_flushed is not None:
+                self._callbacks.append(on_flushed)
+            if (len(self._buffer) >= self.flush_rows
+                    or time.monotonic() - self._last_flush >= self.flush_seconds):
+                self._flush_locked()
+
+    def write(self, row, on_flushed=None) -> None:
+        self.write_rows([row], on_flushed)
+
+    def pending(self) -> int:
+        """Number of buffered rows not yet written."""
+        with self._lock:
+            return len(self._buffer)
+
+    def stale(self) -> bool:
+        """Whether buffered rows have waited longer than `flush_seconds` (no write came to flush them)."""
+        with self._lock:
+            return bool(self._buffer) and time.monotonic() - self._last_flush >= self.flush_seconds
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._closed:
+            return
+        if self._buffer:
+            with metrics.timed("write"):
+                self._write_batch(self._buffer)
+            metrics.count("rows", len(self._buffer))
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._close_output()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvRowSink(_BufferedSink):
+    """CSV output. Rows are dicts keyed by column, sequences in column order, or
+    anything `to_row` turns into a sequence."""
+
+    def __init__(self, filename: str, columns: list, resume: bool = False,
+                 flush_rows: int = 500, flush_seconds: float = 5.0, quoting: int = csv.QUOTE_MINIMAL,
+                 to_row=None):
+        super().__init__(filename, flush_rows, flush_seconds)
+        self.columns = list(columns)
+        self.to_row = to_row
+
+        # A resumed run appends to the existing file instead of truncating it
+        self.appending = resume and os.path.exists(filename) and os.path.getsize(filename) > 0
+        self._file = open(filename, "a" if self.appending else "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file, quoting=quoting)
+        if not self.appending:
+            self._writer.writerow(self.columns)
+            self._file.flush()
+
+    def _prepare(self, row):
+        if self.to_row is not None:
+            return self.to_row(row)
+        if isinstance(row, dict):
+            return [row.get(column) for column in self.columns]
+        return row
+
+    def _write_batch(self, rows: list) -> None:
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _close_output(self) -> None:
+        self._file.close()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+def _coerce(value, type_name: str):
+    if value is None or value == "":
+        return None
+    if type_name.startswith("int"):
+        return int(value)
+    return str(value)
+
+
+class ParquetRowSink(_BufferedSink):
+    """Parquet output with typed columns; every flush becomes one row group.
+
+    Parquet files cannot be appended to, so a resumed run writes its new rows
+    to a separate `<name>.<timestamp>.parquet` file next to the original.
+    """
+
+    def __init__(self, filename: str, schema: list, resume: bool = False,
+                 flush_rows: int = 5000, flush_seconds: float = 30.0):
+        pa, pq = _require_pyarrow()
+        appending = resume and os.path.exists(filename)
+        if appending:
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}.{int(time.time())}{ext}"
+        super().__init__(filename, flush_rows, flush_seconds)
+        self.appending = appending
+        self.schema = list(schema)
+        self._pa = pa
+        self._arrow_schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in self.schema])
+        self._writer = pq.ParquetWriter(filename, self._arrow_schema, compression="zstd")
+
+    def _prepare(self, row):
+        if not isinstance(row, dict):
+            row = dict(zip((name for name, _ in self.schema), row))
+        return {name: _coerce(row.get(name), type_name) for name, type_name in self.schema}
+
+    def _write_batch(self, rows: list) -> None:
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._arrow_schema))
+
+    def _close_output(self) -> None:
+        self._writer.close()
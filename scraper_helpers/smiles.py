@@ -0,0 +1,107 @@
+"""Reaction SMILES helpers for the CRD (kmt.vander-lingen.nl) scraper."""
+
+SMILES_BUTTON_SELECTOR = "button.btn.btn-outline-success.btn-sm[data-reaction-smiles]"
+
+# One round-trip: read every data-reaction-smiles attribute on the page in document order
+_COLLECT_SMILES_JS = """
+return Array.from(document.querySelectorAll(arguments[0]), function (btn) {
+    return btn.getAttribute('data-reaction-smiles');
+});
+"""
+
+
+def collect_reaction_smiles(driver) -> list:
+    """Return the data-reaction-smiles value of every SMILES button on the current page."""
+    values = driver.execute_script(_COLLECT_SMILES_JS, SMILES_BUTTON_SELECTOR) or []
+    return [value for value in values if value]
+
+
+def split_reaction_smiles(smiles_data: str) -> tuple:
+    """Split 'reactants>reagents>products' into its three (stripped) parts."""
+    parts = smiles_data.split(">") if smiles_data else []
+    reactants = parts[0].strip() if len(parts) > 0 else ""
+    solvent_reagents = parts[1].strip() if len(parts) > 1 else ""
+    product = parts[2].strip() if len(parts) > 2 else ""
+    return reactants, solvent_reagents, product
+
+
+def format_smiles_record(link: str, smiles_index: int, reactants: str, solvent_reagents: str,
+                         product: str, modal_title: str = "", modal_text: str = "") -> str:
+    """Build the labelled multi-line blob stored in the 'Data' column of scraped_smiles_data.csv."""
+    return f"""REACTION URL: {link}
+
+SMILES #{smiles_index}
+
+REACTANTS:
+{reactants}
+
+SOLVENT/REAGENTS:
+{solvent_reagents}
+
+PRODUCT:
+{product}
+
+MODAL TITLE:
+{modal_title}
+
+MODAL CONTENT:
+{modal_text}
+
+{'='*70}"""
+
+
+def smiles_record(link: str, product_page: int, smiles_index: int, smiles_data: str,
+                  modal_title: str = "", modal_content: str = "") -> dict:
+    """Structured row for one reaction SMILES (see sinks.SMILES_SCHEMA)."""
+    reactants, solvent_reagents, product = split_reaction_smiles(smiles_data)
+    return {
+        "reaction_url": link,
+        "product_page": product_page,
+        "smiles_index": smiles_index,
+        "reactants": reactants,
+        "reagents": solvent_reagents,
+        "product": product,
+        "modal_title": modal_title,
+        "modal_content": modal_content,
+    }
+
+
+LEGACY_CSV_COLUMNS = ["Reaction URL", "Product Page", "SMILES #", "Data"]
+
+
+def legacy_csv_row(record: dict) -> list:
+    """The four scraped_smiles_data.csv columns for a structured record."""
+    return [
+        record["reaction_url"],
+        record["product_page"],
+        record["smiles_index"],
+        format_smiles_record(record["reaction_url"], record["smiles_index"], record["reactants"],
+                             record["reagents"], record["product"], record["modal_title"], record["modal_content"]),
+    ]
+
+
+_BLOB_LABELS = {
+    "REACTANTS:": "reactants",
+    "SOLVENT/REAGENTS:": "reagents",
+    "PRODUCT:": "product",
+    "MODAL TITLE:": "modal_title",
+    "MODAL CONTENT:": "modal_content",
+}
+
+
+def parse_smiles_record(reaction_url: str, product_page, smiles_index, data: str) -> dict:
+    """Turn a legacy 'Data' blob back into a structured record."""
+    record = {"reaction_url": reaction_url, "product_page": product_page, "smiles_index": smiles_index}
+    fields = {name: [] for name in _BLOB_LABELS.values()}
+    current = None
+    for line in data.splitlines():
+        stripped = line.strip()
+        if stripped in _BLOB_LABELS:
+            current = _BLOB_LABELS[stripped]
+        elif stripped.startswith("=" * 70):
+            current = None
+        elif current is not None:
+            fields[current].append(line)
+    for name, lines in fields.items():
+        record[name] = "\n".join(lines).strip()
+    return record
@@ -0,0 +1,108 @@
+"""Event-driven waits shared by the ORD and CRD scrapers.
+
+Every helper polls the browser until the condition holds and returns as soon
+as it does, instead of sleeping for a fixed time. A timeout is not an error:
+the helpers return None/False so the scrapers carry on exactly as they did
+after a fixed sleep.
+
+benchmarks/check_waits.py runs every helper against a fake driver without
+Chrome. How much crawl time the waits save over the old sleeps has not been
+measured; that needs bench_e2e.py with Chrome on both trees.
+"""
+
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scraper_helpers import metrics
+
+DEFAULT_TIMEOUT = 10
+POLL_FREQUENCY = 0.05
+
+_totals_lock = threading.Lock()
+_totals = {"calls": 0, "timeouts": 0, "seconds": 0.0}
+
+
+def wait_until(driver, condition, timeout: float = DEFAULT_TIMEOUT):
+    """Poll `condition(driver)` until it returns something truthy; None on timeout."""
+    start = time.perf_counter()
+    timed_out = False
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    except TimeoutException:
+        timed_out = True
+        return None
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe("wait", elapsed)
+        with _totals_lock:
+            _totals["calls"] += 1
+            _totals["timeouts"] += timed_out
+            _totals["seconds"] += elapsed
+
+
+def wait_totals() -> dict:
+    """Number of waits, how many timed out and the total seconds spent waiting."""
+    with _totals_lock:
+        return dict(_totals)
+
+
+def wait_for_presence(driver, locator, timeout: float = DEFAULT_TIMEOUT):
+    """Wait for an element matching `locator` to be in the DOM."""
+    return wait_until(driver, EC.presence_of_element_located(locator), timeout)
+
+
+def wait_for_visible(driver, locator, timeout: float = DEFAULT_TIMEOUT):
+    """Wait for an element matching `locator` to be displayed (e.g. `.modal-body`)."""
+    return wait_until(driver, EC.visibility_of_element_located(locator), timeout)
+
+
+def wait_for_gone(driver, locator, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """Wait for every element matching `locator` to be hidden or removed (e.g. a closed modal)."""
+    return bool(wait_until(driver, EC.invisibility_of_element_located(locator), timeout))
+
+
+def wait_for_stale(driver, element, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """Wait for `element` to detach from the DOM, i.e. the page was re-rendered or replaced."""
+    return bool(wait_until(driver, EC.staleness_of(element), timeout))
+
+
+def wait_for_pre_text(driver, timeout: float = DEFAULT_TIMEOUT):
+    """Wait for the first `<pre>` on the page to be populated and return its text."""
+    def populated(d):
+        pre_elements = d.find_elements(By.XPATH, "//pre")
+        if pre_elements:
+            return pre_elements[0].text.strip() or False
+        return False
+    return wait_until(driver, populated, timeout)
+
+
+def wait_for_class_change(driver, element, old_class: str, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """Wait for `element`'s class attribute to differ from `old_class` (e.g. a tab becoming active)."""
+    return bool(wait_until(driver, lambda d: element.get_attribute("class") != old_class, timeout))
+
+
+def wait_for_new_window(driver, old_handles, timeout: float = DEFAULT_TIMEOUT):
+    """Wait for a window handle that is not in `old_handles` and return it."""
+    old_handles = set(old_handles)
+
+    def new_handle(d):
+        for handle in d.window_handles:
+            if handle not in old_handles:
+                return handle
+        return False
+    return wait_until(driver, new_handle, timeout)
+
+
+def wait_for_document_ready(driver, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """Wait for `document.readyState` to be 'complete'."""
+    return bool(wait_until(driver, lambda d: d.execute_script("return document.readyState") == "complete", timeout))
+
+
+def wait_for_count_change(driver, locator, old_count: int, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """Wait for the number of elements matching `locator` to differ from `old_count`."""
+    return bool(wait_until(driver, lambda d: len(d.find_elements(*locator)) != old_count, timeout))
@@ -0,0 +1,219 @@
+"""Resource watchdog keeping long crawls in a fixed memory envelope.
+
+A background thread samples, every `interval` seconds, the resident memory
+of the scraper process and of each pooled browser (chromedriver plus its
+Chrome processes, needs psutil) and the rows buffered in the output sinks:
+
+- a browser over `max_browser_mb` is retired: the pool restarts it when it
+  is next released, or at the scraper's next checkpoint();
+- sinks holding more than `max_buffered_rows` rows in total, or rows older
+  than their flush interval, are flushed.
+
+WebDriver sessions are not thread-safe, so open tabs are only counted at
+checkpoints the scrapers call between units, on their own thread: a session
+with more than `max_tabs` tabs has every tab except the ones in use closed
+(e.g. reaction tabs left behind by an exception).
+
+`stop()` logs the peak and steady-state memory (median of the second half
+of the samples) and adds them to the metrics report as gauges.
+"""
+
+import logging
+import statistics
+import sys
+import threading
+
+from scraper_helpers import browser, metrics
+
+try:
+    import psutil
+except ImportError:  # only the scraper's own peak RSS is reported without psutil
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+log = logging.getLogger(__name__)
+
+MAX_TABS = 4
+MAX_BUFFERED_ROWS = 20000
+INTERVAL = 10.0
+
+
+class SessionRetired(Exception):
+    """Raised at a checkpoint when the watchdog retired the session, so the unit can restart on a fresh one."""
+
+
+def process_mb():
+    """Resident memory of this process in MB (None without psutil)."""
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def peak_process_mb():
+    """Peak resident memory of this process in MB (ru_maxrss is in KB on Linux, bytes on macOS)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ResourceWatchdog:
+    def __init__(self, pools=(), sinks=(), max_tabs: int = MAX_TABS, max_browser_mb: float = browser.MAX_MEMORY_MB,
+                 max_buffered_rows: int = MAX_BUFFERED_ROWS, interval: float = INTERVAL):
+        self.pools = list(pools)
+        self.sinks = [sink for sink in sinks if sink is not None]
+        self.max_tabs = max_tabs
+        self.max_browser_mb = max_browser_mb
+        self.max_buffered_rows = max_buffered_rows
+        self.interval = interval
+        self.stats = {"tabs_closed": 0, "flushes": 0, "retired": 0, "max_tabs_seen": 0}
+        self._samples = []  # total MB (scraper + browsers) per interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "ResourceWatchdog":
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="resource-watchdog", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                log.debug("Watchdog sample failed: %s", e)
+
+    def sample(self) -> None:
+        """Measure memory and buffers once, retiring browsers and flushing sinks over their limits."""
+        total = process_mb()
+        for driver in [driver for pool in list(self.pools) for driver in pool.drivers()]:
+            used = browser.memory_mb(driver)
+            if used is None:
+                continue
+            total = (total or 0.0) + used
+            if used > self.max_browser_mb and not browser.is_retired(driver):
+                log.info("Browser uses %.0f MB (limit %.0f MB), retiring it", used, self.max_browser_mb)
+                browser.retire(driver)
+                self._count("retired")
+        if total is not None:
+            with self._lock:
+                self._samples.append(total)
+
+        buffered = sum(sink.pending() for sink in self.sinks)
+        for sink in sorted(self.sinks, key=lambda s: -s.pending()):
+            if buffered > self.max_buffered_rows or sink.stale():
+                pending = sink.pending()
+                sink.flush()
+                buffered -= pending
+                if pending:
+                    self._count("flushes")
+
+    def checkpoint(self, driver, keep=()) -> bool:
+        """Close stray tabs of `driver` beyond the limit, keeping the first tab (the one the pool
+        returns to), the current tab and `keep`.
+
+        Call between units on the thread using the driver. Returns True when
+        the watchdog retired the session and it should be handed back now.
+        """
+        handles = driver.window_handles
+        with self._lock:
+            self.stats["max_tabs_seen"] = max(self.stats["max_tabs_seen"], len(handles))
+        if len(handles) > self.max_tabs:
+            current = driver.current_window_handle
+            keep = {handles[0], current, *keep}
+            stray = [handle for handle in handles if handle not in keep]
+            log.info("%s tabs open (limit %s), closing %s stray tab(s)", len(handles), self.max_tabs, len(stray))
+            for handle in stray:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(current)
+            self._count("tabs_closed", len(stray))
+        return browser.is_retired(driver)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+        metrics.count(f"watchdog_{name}", amount)
+
+    def memory(self) -> dict:
+        """Peak and steady-state (median of the later half of the samples) MB of the scraper and its browsers."""
+        with self._lock:
+            samples = list(self._samples)
+        return {
+            "peak_mb": max(samples) if samples else None,
+            "steady_mb": statistics.median(samples[len(samples) // 2:]) if samples else None,
+            "scraper_peak_mb": peak_process_mb(),
+        }
+
+    def stop(self) -> dict:
+        """Stop sampling, log the memory summary and record it as metrics gauges."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        memory = self.memory()
+        for name, value in memory.items():
+            if value is not None:
+                metrics.gauge(f"memory_{name}", round(value, 1))
+        if memory["peak_mb"] is not None:
+            log.info("Memory (scraper + browsers): peak %.0f MB, steady %.0f MB", memory["peak_mb"], memory["steady_mb"])
+        if memory["scraper_peak_mb"] is not None:
+            log.info("Scraper peak memory: %.0f MB", memory["scraper_peak_mb"])
+        if self.stats["tabs_closed"] or self.stats["flushes"] or self.stats["retired"]:
+            log.info("Watchdog closed %s stray tab(s), forced %s flush(es), retired %s browser(s)",
+                     self.stats["tabs_closed"], self.stats["flushes"], self.stats["retired"])
+        return memory
+
+
+_active = None
+
+
+def limits_from_args(args) -> dict:
+    """ResourceWatchdog keyword arguments from the add_arguments() options."""
+    return {"max_tabs": args.max_tabs, "max_browser_mb": args.max_browser_mb,
+            "max_buffered_rows": args.max_buffered_rows, "interval": args.watchdog_interval}
+
+
+def start(sinks=(), **limits) -> ResourceWatchdog:
+    """Start the module-level watchdog used by watch(), checkpoint() and stop()."""
+    global _active
+    _active = ResourceWatchdog(sinks=sinks, **limits).start()
+    return _active
+
+
+def watch(pool) -> None:
+    """Add a DriverPool's sessions to the running watchdog, if any."""
+    if _active is not None:
+        _active.pools.append(pool)
+
+
+def checkpoint(driver, keep=()) -> bool:
+    """ResourceWatchdog.checkpoint() of the running watchdog; False when none is running."""
+    return _active.checkpoint(driver, keep) if _active is not None else False
+
+
+def stop():
+    """Stop the running watchdog and return its memory summary (None when none was running)."""
+    global _active
+    if _active is None:
+        return None
+    watchdog, _active = _active, None
+    return watchdog.stop()
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--max-tabs", type=int, default=MAX_TABS, metavar="N",
+                        help="Close stray tabs when a browser has more than N open (default: %(default)s)")
+    parser.add_argument("--max-browser-mb", type=float, default=browser.MAX_MEMORY_MB, metavar="MB",
+                        help="Restart a browser whose processes use more than MB, checked every "
+                             "--watchdog-interval and whenever the pool takes it back (needs psutil; "
+                             "default: %(default)s)")
+    parser.add_argument("--max-buffered-rows", type=int, default=MAX_BUFFERED_ROWS, metavar="N",
+                        help="Flush the outputs when more than N rows are buffered (default: %(default)s)")
+    parser.add_argument("--watchdog-interval", type=float, default=INTERVAL, metavar="SECONDS",
+                        help="Seconds between memory and buffer checks; 0 disables them (default: %(default)s)")